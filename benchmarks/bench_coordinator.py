@@ -0,0 +1,180 @@
+"""Version: 1.1.0 | Datum: 2026-10-18
+Benchmark for LinuxUpdatesCoordinator against simulated apt hosts.
+
+Starts FakeAptServer in-process, creates one coordinator per simulated host
+and runs a number of refresh rounds. Reports SSH handshakes, per-refresh
+latency percentiles, CPU time and peak memory.
+
+    python benchmarks/bench_coordinator.py --hosts 1 10 100 500 --packages 50
+
+With --jump every host is reached through one extra fake host acting as
+jump host.
+
+CPU time and memory include the fake server, which runs in the same process.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+from custom_components.linux_updates.connection import get_connection_manager  # noqa: E402
+from custom_components.linux_updates.const import (  # noqa: E402
+    CONF_HOST,
+    CONF_PORT,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_USE_HELPER,
+    CONF_JUMP_HOST,
+)
+from custom_components.linux_updates.coordinator import LinuxUpdatesCoordinator  # noqa: E402
+
+from fake_apt_host import FakeAptServer, FakeHostProfile  # noqa: E402
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the pct percentile (nearest rank) of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_case(hosts: int, args: argparse.Namespace) -> dict:
+    """Benchmark one fleet size and return the measurements."""
+    profile = FakeHostProfile(
+        packages=args.packages,
+        latency=args.latency,
+        change_every=args.change_every,
+    )
+    with tempfile.TemporaryDirectory() as config_dir, tempfile.TemporaryDirectory() as sftp_root:
+        server = FakeAptServer(profile, sftp_root)
+        await server.start(hosts + 1 if args.jump else hosts)
+        ports = server.ports[:hosts]
+        jump_host = f"bench@127.0.0.1:{server.ports[-1]}" if args.jump else None
+
+        hass = HomeAssistant(config_dir)
+        coordinators = []
+        for index, port in enumerate(ports):
+            entry = SimpleNamespace(
+                entry_id=f"bench{index}",
+                title=f"bench{index}",
+                options={},
+                data={
+                    CONF_HOST: "127.0.0.1",
+                    CONF_PORT: port,
+                    CONF_USERNAME: "bench",
+                    CONF_PASSWORD: "bench",
+                    CONF_USE_HELPER: args.helper,
+                    CONF_JUMP_HOST: jump_host,
+                },
+            )
+            coordinators.append(LinuxUpdatesCoordinator(hass, entry))
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies: list[float] = []
+        failures = 0
+
+        async def refresh(coordinator: LinuxUpdatesCoordinator) -> None:
+            nonlocal failures
+            async with semaphore:
+                start = time.perf_counter()
+                await coordinator.async_refresh()
+                latencies.append(time.perf_counter() - start)
+                if not coordinator.last_update_success:
+                    failures += 1
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+
+        for _ in range(args.rounds):
+            await asyncio.gather(*(refresh(coordinator) for coordinator in coordinators))
+
+        if args.upgrade:
+            await asyncio.gather(*(coordinator.trigger_update() for coordinator in coordinators))
+
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        peak = tracemalloc.get_traced_memory()[1] if args.tracemalloc else None
+        if args.tracemalloc:
+            tracemalloc.stop()
+
+        handshakes = get_connection_manager(hass).handshakes
+        for coordinator in coordinators:
+            await coordinator.async_shutdown()
+        await server.stop()
+        await hass.async_stop(force=True)
+
+    return {
+        "hosts": hosts,
+        "refreshes": len(latencies),
+        "failures": failures,
+        "handshakes": handshakes,
+        "server_connections": server.stats.connections,
+        "commands": dict(sorted(server.stats.commands.items())),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "cpu_ms_per_refresh": cpu / max(1, len(latencies)) * 1000,
+        "peak_traced_kib": peak / 1024 if peak is not None else None,
+        "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def print_report(results: list[dict]) -> None:
+    """Print one line per fleet size."""
+    header = (
+        f"{'hosts':>6} {'refr':>6} {'fail':>5} {'hshk':>6} {'p50ms':>8} {'p90ms':>8} {'p99ms':>8} "
+        f"{'wall s':>8} {'cpu s':>8} {'cpu/ref':>8} {'peakKiB':>9} {'rssKiB':>9}  commands"
+    )
+    print(header)
+    for res in results:
+        peak = f"{res['peak_traced_kib']:.0f}" if res["peak_traced_kib"] is not None else "-"
+        print(
+            f"{res['hosts']:>6} {res['refreshes']:>6} {res['failures']:>5} {res['handshakes']:>6} "
+            f"{res['p50_ms']:>8.1f} {res['p90_ms']:>8.1f} {res['p99_ms']:>8.1f} "
+            f"{res['wall_s']:>8.2f} {res['cpu_s']:>8.2f} {res['cpu_ms_per_refresh']:>8.2f} "
+            f"{peak:>9} {res['max_rss_kib']:>9}  {res['commands']}"
+        )
+
+
+def main() -> None:
+    """Parse arguments and run every requested fleet size."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1, 10, 100, 500])
+    parser.add_argument("--packages", type=int, default=50, help="pending packages per host")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per remote command")
+    parser.add_argument("--rounds", type=int, default=3, help="refreshes per host")
+    parser.add_argument("--concurrency", type=int, default=50, help="refreshes in flight")
+    parser.add_argument("--change-every", type=int, default=0,
+                        help="change the host fingerprint every N checks (0 = never)")
+    parser.add_argument("--helper", action="store_true", help="use the remote helper mode")
+    parser.add_argument("--upgrade", action="store_true", help="also run one upgrade per host")
+    parser.add_argument("--jump", action="store_true", help="connect through one shared jump host")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="measure peak Python allocations (slower)")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run_case(hosts, args)) for hosts in args.hosts]
+    print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""Version: 1.5.1 | Datum: 2026-10-18
+In-process asyncssh server that answers like a Debian/Ubuntu host.
+
+Used by bench_coordinator.py. Every simulated host is a listener on its own
+port on 127.0.0.1, all sharing one event loop and one set of counters.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+
+import asyncssh
+
+# Recorded from a Debian 12 host and repeated to the requested size
+_INST_LINE = (
+    "Inst {name} [1.{i}.0-1] (1.{i}.0-1+deb12u1 Debian-Security:12/stable-security [amd64])"
+)
+_CONF_LINE = "Conf {name} (1.{i}.0-1+deb12u1 Debian-Security:12/stable-security [amd64])"
+_SIMULATE_HEADER = """NOTE: This is only a simulation!
+      apt-get needs root privileges for real execution.
+      Keep also in mind that locking is deactivated,
+      so don't depend on the relevance to the real current situation!
+Reading package lists...
+Building dependency tree...
+Reading state information...
+Calculating upgrade...
+The following packages will be upgraded:
+"""
+
+
+@dataclass
+class FakeHostProfile:
+    """What the simulated hosts answer and how slowly."""
+
+    packages: int = 50
+    latency: float = 0.05  # Seconds before each command answers
+    upgrade_line_delay: float = 0.0  # Seconds between streamed upgrade lines
+    change_every: int = 0  # Change the fingerprint every N checks (0 = never)
+    locked_upgrades: int = 0  # The first N upgrades fail on a held dpkg lock
+
+
+@dataclass
+class FakeServerStats:
+    """Counters collected on the server side."""
+
+    connections: int = 0
+    commands: dict[str, int] = field(default_factory=dict)
+
+    def count(self, kind: str) -> None:
+        self.commands[kind] = self.commands.get(kind, 0) + 1
+
+
+def simulate_output(packages: int) -> str:
+    """Return 'apt-get -s upgrade' output with the given number of upgrades."""
+    names = [f"pkg{i}" for i in range(packages)]
+    lines = [_SIMULATE_HEADER + "  " + " ".join(names)]
+    lines.append(f"{packages} upgraded, 0 newly installed, 0 to remove and 0 not upgraded.")
+    lines += [_INST_LINE.format(name=name, i=i) for i, name in enumerate(names)]
+    lines += [_CONF_LINE.format(name=name, i=i) for i, name in enumerate(names)]
+    return "\n".join(lines) + "\n"
+
+
+def upgrade_lines(packages: int) -> list[str]:
+    """Return the lines an 'apt-get update && upgrade' prints."""
+    lines = [
+        "Hit:1 http://deb.debian.org/debian bookworm InRelease",
+        "Reading package lists...",
+        "Reading package lists...",
+        f"{packages} upgraded, 0 newly installed, 0 to remove and 0 not upgraded.",
+        f"Need to get {packages * 250} kB of archives.",
+    ]
+    lines += [
+        f"Get:{i + 1} http://deb.debian.org/debian-security bookworm-security/main amd64 pkg{i} amd64 [250 kB]"
+        for i in range(packages)
+    ]
+    lines.append(f"Fetched {packages * 250} kB in 1s (10 MB/s)")
+    for i in range(packages):
+        lines.append(f"Unpacking pkg{i}:amd64 (1.{i}.0-1+deb12u1) over (1.{i}.0-1) ...")
+    for i in range(packages):
+        lines.append(f"Setting up pkg{i}:amd64 (1.{i}.0-1+deb12u1) ...")
+    return lines
+
+
+class FakeAptHost(asyncssh.SSHServer):
+    """Accept any password and count handshakes."""
+
+    def __init__(self, stats: FakeServerStats) -> None:
+        self._stats = stats
+
+    def connection_made(self, conn: asyncssh.SSHServerConnection) -> None:
+        self._stats.connections += 1
+
+    def begin_auth(self, username: str) -> bool:
+        return True
+
+    def password_auth_supported(self) -> bool:
+        return True
+
+    def validate_password(self, username: str, password: str) -> bool:
+        return True
+
+    def connection_requested(
+        self, dest_host: str, dest_port: int, orig_host: str, orig_port: int
+    ) -> bool:
+        # Every fake host can act as jump host for the others
+        return True
+
+
+class FakeAptServer:
+    """Listeners answering the integration's commands for many fake hosts."""
+
+    def __init__(self, profile: FakeHostProfile, sftp_root: str) -> None:
+        self.profile = profile
+        self.stats = FakeServerStats()
+        self._sftp_root = sftp_root
+        self._simulate = simulate_output(profile.packages)
+        self._checks: dict[int, int] = {}
+        self._boot_ids: dict[int, str] = {}
+        self._touched: dict[int, int] = {}
+        self._watchers: dict[int, set[asyncio.Queue]] = {}
+        self._servers = []
+        self.ports: list[int] = []
+
+    async def start(self, hosts: int) -> None:
+        """Start one listener per simulated host with a throwaway host key."""
+        host_key = asyncssh.generate_private_key("ssh-ed25519")
+        for _ in range(hosts):
+            server = await asyncssh.listen(
+                "127.0.0.1",
+                0,
+                server_host_keys=[host_key],
+                server_factory=lambda: FakeAptHost(self.stats),
+                process_factory=self._handle_process,
+                sftp_factory=self._sftp_server,
+                allow_scp=False,
+            )
+            self._servers.append(server)
+            self.ports.append(server.sockets[0].getsockname()[1])
+
+    async def stop(self) -> None:
+        """Stop listening and drop all connections."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+
+    def _sftp_server(self, chan: asyncssh.SSHServerChannel) -> asyncssh.SFTPServer:
+        """Give every simulated host its own home directory."""
+        home = os.path.join(self._sftp_root, str(chan.get_extra_info("sockname")[1]))
+        os.makedirs(home, exist_ok=True)
+        return asyncssh.SFTPServer(chan, chroot=os.fsencode(home))
+
+    def touch(self, port: int) -> None:
+        """Change a host's package state behind the integration's back."""
+        self._touched[port] = self._touched.get(port, 0) + 1
+        for queue in self._watchers.get(port, ()):
+            queue.put_nowait("/var/lib/dpkg/status")
+
+    def _fingerprint(self, host: int) -> str:
+        """Return a fingerprint that changes every ``change_every`` checks."""
+        checks = self._checks.get(host, 0)
+        generation = checks // self.profile.change_every if self.profile.change_every else 0
+        generation += self._touched.get(host, 0)
+        return f"1700000000:4096 {1700000000 + generation}:{self.profile.packages * 1000}"
+
+    def _helper_output(self, host: int, known: str) -> str:
+        """Answer like the uploaded helper script."""
+        fp = self._fingerprint(host)
+        doc = {"v": 1, "fp": fp, "reboot_required": False, "lists_age": 600}
+        if known == fp:
+            doc["unchanged"] = True
+        else:
+            doc["count"] = self.profile.packages
+            doc["packages"] = [
+                [f"pkg{i}", f"1.{i}.0-1", f"1.{i}.0-1+deb12u1",
+                 "Debian-Security:12/stable-security", "amd64"]
+                for i in range(self.profile.packages)
+            ]
+        return json.dumps(doc, separators=(",", ":")) + "\n"
+
+    async def _handle_process(self, process: asyncssh.SSHServerProcess) -> None:
+        """Dispatch one exec request."""
+        command = process.command or ""
+        host = process.get_extra_info("sockname")[1]
+        await asyncio.sleep(self.profile.latency)
+
+        if 'command -v "$c"' in command:
+            self.stats.count("detect")
+            process.stdout.write("/usr/bin/apt-get\n")
+        elif "inotifywait" in command:
+            # Push mode watcher, runs until the client closes the channel
+            self.stats.count("watch")
+            queue: asyncio.Queue = asyncio.Queue()
+            self._watchers.setdefault(host, set()).add(queue)
+            closed = asyncio.ensure_future(process.stdin.read())
+            try:
+                process.stdout.write("watch: inotify\n")
+                while not closed.done():
+                    event = asyncio.ensure_future(queue.get())
+                    await asyncio.wait({event, closed}, return_when=asyncio.FIRST_COMPLETED)
+                    if event.done():
+                        process.stdout.write(event.result() + "\n")
+                    else:
+                        event.cancel()
+            except (asyncssh.Error, OSError):
+                pass
+            finally:
+                closed.cancel()
+                self._watchers[host].discard(queue)
+        elif "stat -c" in command and "helper-" not in command:
+            self.stats.count("fingerprint")
+            self._checks[host] = self._checks.get(host, 0) + 1
+            process.stdout.write(
+                f"{int(time.time())}\n" + self._fingerprint(host).replace(" ", "\n")
+                + "\nreboot-required: no\n"
+            )
+        elif "helper-" in command:
+            self.stats.count("helper")
+            self._checks[host] = self._checks.get(host, 0) + 1
+            match = re.search(r"helper-\w+\.sh '([^']*)'", command)
+            known = match.group(1) if match else ""
+            process.stdout.write(self._helper_output(host, known))
+        elif "apt-get -s" in command:
+            self.stats.count("simulate")
+            process.stdout.write(self._simulate)
+        elif ("upgrade -y" in command or "--download-only" in command) and (
+            self.stats.commands.get("locked", 0) < self.profile.locked_upgrades
+        ):
+            self.stats.count("locked")
+            process.stdout.write(
+                "E: Could not get lock /var/lib/dpkg/lock-frontend. "
+                "It is held by process 4242 (unattended-upgr)\n"
+            )
+            process.exit(100)
+            return
+        elif "upgrade -y" in command or "--download-only" in command:
+            self.stats.count("upgrade")
+            for line in upgrade_lines(self.profile.packages):
+                process.stdout.write(line + "\n")
+                if self.profile.upgrade_line_delay:
+                    await asyncio.sleep(self.profile.upgrade_line_delay)
+        elif "boot_id" in command:
+            self.stats.count("boot_id")
+            process.stdout.write(self._boot_ids.setdefault(host, str(uuid.uuid4())) + "\n")
+        elif "reboot" in command:
+            self.stats.count("reboot")
+            self._boot_ids[host] = str(uuid.uuid4())
+        else:
+            self.stats.count("other")
+            process.stdout.write("test\n")
+
+        process.exit(0)
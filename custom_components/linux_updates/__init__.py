@@ -1,4 +1,4 @@
-"""Version: 1.1.0 | Datum: 2025-12-19
+"""Version: 1.5.0 | Datum: 2026-10-18
 The Linux Updates integration.
 """
 from __future__ import annotations
@@ -6,21 +6,45 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.typing import ConfigType
 
+from .const import DOMAIN
 from .coordinator import LinuxUpdatesCoordinator
+from .fleet import LinuxUpdatesFleetCoordinator, is_fleet_config
+from .services import async_setup_services
+from .storage import EntryStore
 
 PLATFORMS: list[Platform] = [Platform.SENSOR, Platform.BINARY_SENSOR, Platform.BUTTON]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services shared by all config entries."""
+    async_setup_services(hass)
+    return True
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Linux Updates from a config entry."""
 
-    coordinator = LinuxUpdatesCoordinator(hass, entry)
+    if is_fleet_config(entry.data):
+        # Fleet mode: one timer for all hosts, one device per host
+        coordinator = LinuxUpdatesFleetCoordinator(hass, entry)
+        await coordinator.async_setup_hosts()
+    else:
+        coordinator = LinuxUpdatesCoordinator(hass, entry)
 
-    # Initial data fetch
-    await coordinator.async_config_entry_first_refresh()
+    # Restore the last known state so entities have values right away, and
+    # run the first SSH check in the background instead of blocking startup.
+    store = EntryStore(hass, entry.entry_id)
+    await store.async_load()
+    store.async_restore(coordinator.host_coordinators)
+    entry.async_create_background_task(
+        hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.title}"
+    )
 
-    hass.data.setdefault("linux_updates", {})
-    hass.data["linux_updates"][entry.entry_id] = coordinator
+    hass.data.setdefault(DOMAIN, {})
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -32,10 +56,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data["linux_updates"].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        # Close the pooled SSH connection unless another entry shares it
+        await coordinator.async_shutdown()
 
     return unload_ok
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved state of a removed config entry."""
+    await EntryStore(hass, entry.entry_id).async_remove()
+
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(entry.entry_id)
\ No newline at end of file
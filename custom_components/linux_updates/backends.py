@@ -0,0 +1,232 @@
+"""Version: 1.3.0 | Datum: 2026-10-18
+Package manager backends for Linux Updates.
+
+Each backend knows how to fingerprint, query and upgrade one package manager.
+Queries only read the local metadata cache, so polling never refreshes
+repositories or waits for a package manager lock.
+"""
+from __future__ import annotations
+
+import posixpath
+from typing import Callable
+
+from .const import (
+    APT_HISTORY_DIR,
+    APT_HISTORY_MAX_BYTES,
+    CMD_APT_LISTS_FRESH,
+    CMD_APT_UPDATE,
+    CMD_CHECK_UPDATES,
+    CMD_FINGERPRINT,
+    CMD_UPGRADE,
+    CMD_PREFETCH,
+    CMD_UPGRADE_PREFETCHED,
+    CMD_DNF_CHECK_UPDATES,
+    CMD_DNF_UPGRADE,
+    CMD_DNF_PREFETCH,
+    CMD_DNF_UPGRADE_PREFETCHED,
+    CMD_YUM_CHECK_UPDATES,
+    CMD_YUM_UPGRADE,
+    CMD_YUM_PREFETCH,
+    CMD_YUM_UPGRADE_PREFETCHED,
+    CMD_ZYPPER_CHECK_UPDATES,
+    CMD_ZYPPER_UPGRADE,
+    CMD_ZYPPER_PREFETCH,
+    CMD_ZYPPER_UPGRADE_PREFETCHED,
+    CMD_PACMAN_CHECK_UPDATES,
+    CMD_PACMAN_UPGRADE,
+    CMD_PACMAN_PREFETCH,
+    CMD_PACMAN_UPGRADE_PREFETCHED,
+    CMD_APK_CHECK_UPDATES,
+    CMD_APK_UPGRADE,
+)
+from .parser import (
+    PackageRecord,
+    parse_apk_version,
+    parse_apt_simulate,
+    parse_dnf_check_update,
+    parse_pacman_query,
+    parse_zypper_list_updates,
+)
+
+_RPM_DB = '"$(rpm --eval %_dbpath)"'
+
+
+def _fingerprint_command(metadata: tuple[str, ...], state: str) -> str:
+    """Return a command printing the time and ``mtime:size`` of two paths.
+
+    The first existing metadata path is used, as the cache location differs
+    between versions of the same package manager. The output has the same
+    shape as CMD_FINGERPRINT.
+    """
+    return (
+        f"date +%s; for m in {' '.join(metadata)}; do [ -e \"$m\" ] && break; done; "
+        f"stat -c %Y:%s \"$m\" {state}"
+    )
+
+
+def skip_fresh_apt_update(command: str, max_age: int) -> str:
+    """Return ``command`` with its apt-get update skipped while the lists are fresh.
+
+    The age is checked on the host, right before the upgrade, so an update
+    run by unattended-upgrades a few minutes earlier is not repeated.
+    ``max_age`` is in minutes, 0 keeps the update unconditional. Commands
+    without an apt-get update are returned unchanged.
+    """
+    if max_age <= 0 or CMD_APT_UPDATE not in command:
+        return command
+    fresh = CMD_APT_LISTS_FRESH.format(minutes=max_age)
+    return command.replace(
+        CMD_APT_UPDATE,
+        f"if {fresh}; then echo 'apt lists are fresh, skipping apt-get update'; "
+        f"else {CMD_APT_UPDATE}; fi",
+        1,
+    )
+
+
+def apt_history_command(position: tuple[int, int] | None) -> str:
+    """Return a command printing what apt logged since ``position``.
+
+    ``position`` is the (inode, byte offset) reached by the previous call.
+    The output is a "history-log: <inode> <offset> <utc offset>" header
+    followed by the log from that offset on, at most APT_HISTORY_MAX_BYTES.
+    After a logrotate the rest of the rotated file is read first. Without a
+    position nothing is read, the header then marks the end of the log so
+    only later transactions are reported. Prints nothing if the log is
+    unreadable (the user must be in the adm group).
+    """
+    header = 'echo "history-log: $1 {offset} $(date +%z)"'
+    script = (
+        f"cd {APT_HISTORY_DIR} 2>/dev/null && [ -r history.log ] && {{ "
+        "set -- $(stat -c '%i %s' history.log history.log.1 2>/dev/null); "
+    )
+    if position is None:
+        return script + header.format(offset="$2") + "; }"
+    inode, offset = position
+    tail = f"tail -c +{offset + 1}"
+    return script + (
+        f'if [ "$1" = {inode} ] && [ "$2" -ge {offset} ]; then '
+        f"{header.format(offset=offset)}; {tail} history.log | head -c {APT_HISTORY_MAX_BYTES}; "
+        f'elif [ "$3" = {inode} ] && [ "$4" -gt {offset} ]; then shift 2; '
+        f"{header.format(offset=offset)}; {tail} history.log.1 | head -c {APT_HISTORY_MAX_BYTES}; "
+        f"else {header.format(offset=0)}; head -c {APT_HISTORY_MAX_BYTES} history.log; fi; }}"
+    )
+
+
+class PackageBackend:
+    """Commands and parser for one package manager."""
+
+    def __init__(
+        self,
+        name: str,
+        binary: str,
+        fingerprint_command: str,
+        check_command: str,
+        upgrade_command: str,
+        parse: Callable[[str], tuple[int, list[PackageRecord]]],
+        ok_statuses: frozenset[int] = frozenset({0}),
+        prefetch_command: str | None = None,
+        upgrade_prefetched_command: str | None = None,
+    ) -> None:
+        """Initialize.
+
+        ``prefetch_command`` downloads the pending packages without installing
+        them and ``upgrade_prefetched_command`` then installs them without
+        refreshing the metadata again. Backends without them can't prefetch.
+        """
+        self.name = name
+        self.binary = binary
+        self.fingerprint_command = fingerprint_command
+        self.check_command = check_command
+        self.upgrade_command = upgrade_command
+        self.parse = parse
+        self.ok_statuses = ok_statuses
+        self.prefetch_command = prefetch_command
+        self.upgrade_prefetched_command = upgrade_prefetched_command or upgrade_command
+
+    def __repr__(self) -> str:
+        return f"PackageBackend({self.name})"
+
+    def check_succeeded(self, exit_status: int | None, stderr: str | None) -> bool:
+        """Return True if the query ran, with or without pending updates.
+
+        dnf and yum exit with 100 when updates are available and pacman with
+        1 when there are none, so the exit status alone is not enough.
+        """
+        if exit_status not in self.ok_statuses:
+            return False
+        return not (stderr or "").lstrip().lower().startswith("error")
+
+
+APT = PackageBackend(
+    "apt",
+    "apt-get",
+    CMD_FINGERPRINT,
+    CMD_CHECK_UPDATES,
+    CMD_UPGRADE,
+    parse_apt_simulate,
+    prefetch_command=CMD_PREFETCH,
+    upgrade_prefetched_command=CMD_UPGRADE_PREFETCHED,
+)
+DNF = PackageBackend(
+    "dnf",
+    "dnf",
+    _fingerprint_command(("/var/cache/libdnf5", "/var/cache/dnf"), _RPM_DB),
+    CMD_DNF_CHECK_UPDATES,
+    CMD_DNF_UPGRADE,
+    parse_dnf_check_update,
+    frozenset({0, 100}),
+    prefetch_command=CMD_DNF_PREFETCH,
+    upgrade_prefetched_command=CMD_DNF_UPGRADE_PREFETCHED,
+)
+YUM = PackageBackend(
+    "yum",
+    "yum",
+    _fingerprint_command(("/var/cache/yum",), _RPM_DB),
+    CMD_YUM_CHECK_UPDATES,
+    CMD_YUM_UPGRADE,
+    parse_dnf_check_update,
+    frozenset({0, 100}),
+    prefetch_command=CMD_YUM_PREFETCH,
+    upgrade_prefetched_command=CMD_YUM_UPGRADE_PREFETCHED,
+)
+ZYPPER = PackageBackend(
+    "zypper",
+    "zypper",
+    _fingerprint_command(("/var/cache/zypp/solv",), _RPM_DB),
+    CMD_ZYPPER_CHECK_UPDATES,
+    CMD_ZYPPER_UPGRADE,
+    parse_zypper_list_updates,
+    prefetch_command=CMD_ZYPPER_PREFETCH,
+    upgrade_prefetched_command=CMD_ZYPPER_UPGRADE_PREFETCHED,
+)
+PACMAN = PackageBackend(
+    "pacman",
+    "pacman",
+    _fingerprint_command(("/var/lib/pacman/sync",), "/var/lib/pacman/local"),
+    CMD_PACMAN_CHECK_UPDATES,
+    CMD_PACMAN_UPGRADE,
+    parse_pacman_query,
+    frozenset({0, 1}),
+    prefetch_command=CMD_PACMAN_PREFETCH,
+    upgrade_prefetched_command=CMD_PACMAN_UPGRADE_PREFETCHED,
+)
+APK = PackageBackend(
+    "apk",
+    "apk",
+    _fingerprint_command(("/var/cache/apk", "/etc/apk/cache"), "/lib/apk/db/installed"),
+    CMD_APK_CHECK_UPDATES,
+    CMD_APK_UPGRADE,
+    parse_apk_version,
+)
+
+# In order of preference, e.g. dnf before its yum compatibility wrapper
+BACKENDS = {backend.name: backend for backend in (APT, DNF, YUM, ZYPPER, PACMAN, APK)}
+
+
+def detect_backend(output: str) -> PackageBackend | None:
+    """Pick the backend from the output of CMD_DETECT_PACKAGE_MANAGER."""
+    found = {posixpath.basename(line.strip()) for line in output.splitlines()}
+    for backend in BACKENDS.values():
+        if backend.binary in found:
+            return backend
+    return None
@@ -1,8 +1,9 @@
-"""Version: 1.5.0 | Datum: 2025-12-19
+"""Version: 1.9.0 | Datum: 2026-10-18
 Binary sensors for Linux Updates.
 """
 from homeassistant.components.binary_sensor import BinarySensorEntity, BinarySensorDeviceClass
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -15,8 +16,16 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the binary sensors."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([LinuxUpdateProblemSensor(coordinator)])
+    entities = []
+    for coordinator in hass.data[DOMAIN][entry.entry_id].host_coordinators:
+        entities.extend([
+            LinuxUpdateProblemSensor(coordinator),
+            LinuxRebootRequiredSensor(coordinator),
+        ])
+        if coordinator.push_mode:
+            entities.append(LinuxPushChannelSensor(coordinator))
+
+    async_add_entities(entities)
 
 class LinuxUpdateProblemSensor(CoordinatorEntity, BinarySensorEntity):
     """Representation of an Error State."""
@@ -26,7 +35,7 @@ class LinuxUpdateProblemSensor(CoordinatorEntity, BinarySensorEntity):
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_update_problem"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_update_problem"
         self._attr_name = "Update Problem" # Rent namn
 
     @property
@@ -40,5 +49,60 @@ class LinuxUpdateProblemSensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def extra_state_attributes(self):
         return {
-            "error_message": self.coordinator.error_message
-        }
\ No newline at end of file
+            "error_message": self.coordinator.error_message,
+            "package_manager_locked_by": self.coordinator.lock_holder,
+        }
+
+class LinuxRebootRequiredSensor(CoordinatorEntity, BinarySensorEntity):
+    """On when the host asks for a reboot (/var/run/reboot-required)."""
+
+    _attr_icon = "mdi:restart-alert"
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_reboot_required"
+        self._attr_name = "Reboot Required"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def is_on(self):
+        return self.coordinator.reboot_required
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "packages": self.coordinator.reboot_packages
+        }
+
+class LinuxPushChannelSensor(CoordinatorEntity, BinarySensorEntity):
+    """On while the push mode channel is up, off while the host is polled."""
+
+    _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_push_channel"
+        self._attr_name = "Push Channel"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def is_on(self):
+        return self.coordinator.watcher is not None and self.coordinator.watcher.connected
+
+    @property
+    def extra_state_attributes(self):
+        watcher = self.coordinator.watcher
+        return {
+            "mode": watcher.mode if watcher else None,
+            "events": watcher.events if watcher else 0,
+            "last_error": watcher.last_error if watcher else None,
+        }
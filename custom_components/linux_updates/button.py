@@ -1,4 +1,4 @@
-"""Version: 1.7.0 | Datum: 2025-12-19
+"""Version: 1.10.1 | Datum: 2026-10-18
 Buttons for Linux Updates.
 """
 from homeassistant.components.button import ButtonEntity
@@ -15,12 +15,18 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the buttons."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
-    async_add_entities([
-        LinuxUpdateRunButton(coordinator),
-        LinuxRebootButton(coordinator),
-        LinuxCheckButton(coordinator) # Ny knapp
-    ])
+    entities = []
+    for coordinator in hass.data[DOMAIN][entry.entry_id].host_coordinators:
+        entities.extend([
+            LinuxUpdateRunButton(coordinator),
+            LinuxRebootButton(coordinator),
+            LinuxCheckButton(coordinator), # Ny knapp
+        ])
+        # Ingen förhämtning för pakethanterare som saknar stöd (apk)
+        if coordinator.supports_prefetch:
+            entities.append(LinuxPrefetchButton(coordinator))
+
+    async_add_entities(entities)
 
 class LinuxUpdateRunButton(CoordinatorEntity, ButtonEntity):
     """Button to trigger update."""
@@ -30,7 +36,7 @@ class LinuxUpdateRunButton(CoordinatorEntity, ButtonEntity):
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_run_updates"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_run_updates"
         self._attr_name = "Run Updates"
 
     @property
@@ -49,7 +55,7 @@ class LinuxRebootButton(CoordinatorEntity, ButtonEntity):
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_reboot_server"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_reboot_server"
         self._attr_name = "Reboot Server"
 
     @property
@@ -68,7 +74,7 @@ class LinuxCheckButton(CoordinatorEntity, ButtonEntity):
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_check_updates"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_check_updates"
         self._attr_name = "Check for Updates"
 
     @property
@@ -77,5 +83,29 @@ class LinuxCheckButton(CoordinatorEntity, ButtonEntity):
 
     async def async_press(self) -> None:
         """Handle the button press."""
-        # This forces the coordinator to run _async_update_data immediately
-        await self.coordinator.async_request_refresh()
\ No newline at end of file
+        # This forces a full check immediately, even if nothing changed on the host
+        await self.coordinator.async_force_check()
+
+class LinuxPrefetchButton(CoordinatorEntity, ButtonEntity):
+    """Button to download pending packages ahead of the upgrade."""
+
+    _attr_icon = "mdi:download"
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_prefetch_updates"
+        self._attr_name = "Prefetch Updates"
+
+    @property
+    def available(self) -> bool:
+        """Unavailable once the host turns out to have no prefetch support."""
+        return super().available and self.coordinator.supports_prefetch
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    async def async_press(self) -> None:
+        """Handle the button press."""
+        await self.coordinator.trigger_prefetch()
@@ -1,9 +1,8 @@
-"""Version: 1.7.0 | Datum: 2025-12-19
+"""Version: 1.16.1 | Datum: 2026-10-18
 Config flow for Linux Updates integration.
 """
 from typing import Any
 import voluptuous as vol
-import asyncssh
 
 from homeassistant import config_entries
 from homeassistant.core import HomeAssistant, callback
@@ -18,30 +17,82 @@ from .const import (
     CONF_SSH_KEY,
     CONF_DEBUG,
     CONF_SCAN_INTERVAL,
-    DEFAULT_SCAN_INTERVAL
+    CONF_USE_HELPER,
+    CONF_PUSH_MODE,
+    CONF_FLEET_HOSTS,
+    CONF_INVENTORY_FILE,
+    CONF_FLEET_CONCURRENCY,
+    CONF_PREFETCH_HOUR,
+    CONF_APT_LISTS_MAX_AGE,
+    CONF_JUMP_HOST,
+    CONF_CONNECT_TIMEOUT,
+    CONF_CHECK_TIMEOUT,
+    CONF_UPGRADE_TIMEOUT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_APT_LISTS_MAX_AGE,
+    DEFAULT_FLEET_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_CHECK_TIMEOUT,
+    DEFAULT_UPGRADE_TIMEOUT,
 )
+from .connection import SSHError, get_connection_manager
+from .fleet import is_fleet_config, load_hosts
+
+# Timme för automatisk prefetch, tomt fält = ingen schemalagd prefetch
+PREFETCH_HOUR = vol.All(vol.Coerce(int), vol.Range(min=0, max=23))
+# Tidsgränser i sekunder
+TIMEOUT = vol.All(vol.Coerce(int), vol.Range(min=1))
 
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
     try:
-        client_keys = [data[CONF_SSH_KEY]] if data.get(CONF_SSH_KEY) else None
-
-        # Test connection
-        async with asyncssh.connect(
-            data[CONF_HOST],
-            port=data[CONF_PORT],
-            username=data[CONF_USERNAME],
-            password=data.get(CONF_PASSWORD),
-            client_keys=client_keys,
-            known_hosts=None
-        ) as conn:
-            await conn.run("echo test", check=True)
-
-    except (OSError, asyncssh.Error) as err:
+        # Test connection. The connection stays in the shared pool so the
+        # config entry created from this flow can reuse it.
+        await get_connection_manager(hass).async_run(data, "echo test", check=True)
+
+    except (OSError, SSHError) as err:
         raise Exception(f"Cannot connect: {err}") from err
 
     return {"title": f"{data[CONF_USERNAME]}@{data[CONF_HOST]}"}
 
+async def validate_fleet_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the host list and that the credentials work on the first host.
+
+    Raises ValueError if the host list or inventory file is unusable.
+    """
+    try:
+        hosts = await hass.async_add_executor_job(load_hosts, hass, data)
+    except OSError as err:
+        raise ValueError(f"Cannot read inventory: {err}") from err
+    if not hosts:
+        raise ValueError("No hosts given")
+
+    await validate_input(hass, {**data, **hosts[0]})
+
+    return {"title": f"Linux Fleet ({len(hosts)} hosts)"}
+
+def _fleet_schema(defaults: dict[str, Any]) -> vol.Schema:
+    """Return the form schema for a fleet of hosts."""
+    return vol.Schema({
+        vol.Optional(CONF_FLEET_HOSTS, default=defaults.get(CONF_FLEET_HOSTS, "")): str,
+        vol.Optional(CONF_INVENTORY_FILE, default=defaults.get(CONF_INVENTORY_FILE, "")): str,
+        vol.Required(CONF_USERNAME, default=defaults.get(CONF_USERNAME, "")): str,
+        vol.Optional(CONF_PASSWORD, default=defaults.get(CONF_PASSWORD, "")): str,
+        vol.Optional(CONF_SSH_KEY, default=defaults.get(CONF_SSH_KEY, "")): str,
+        vol.Optional(CONF_PORT, default=defaults.get(CONF_PORT, 22)): int,
+        vol.Optional(CONF_JUMP_HOST, default=defaults.get(CONF_JUMP_HOST, "")): str,
+        vol.Optional(CONF_FLEET_CONCURRENCY, default=defaults.get(CONF_FLEET_CONCURRENCY, DEFAULT_FLEET_CONCURRENCY)): int,
+        vol.Optional(CONF_SCAN_INTERVAL, default=defaults.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)): int,
+        vol.Optional(CONF_USE_HELPER, default=defaults.get(CONF_USE_HELPER, False)): bool,
+        vol.Optional(CONF_PUSH_MODE, default=defaults.get(CONF_PUSH_MODE, False)): bool,
+        vol.Optional(CONF_PREFETCH_HOUR, description={"suggested_value": defaults.get(CONF_PREFETCH_HOUR)}): PREFETCH_HOUR,
+        vol.Optional(CONF_APT_LISTS_MAX_AGE, default=defaults.get(CONF_APT_LISTS_MAX_AGE, DEFAULT_APT_LISTS_MAX_AGE)): int,
+        vol.Optional(CONF_CONNECT_TIMEOUT, default=defaults.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)): TIMEOUT,
+        vol.Optional(CONF_CHECK_TIMEOUT, default=defaults.get(CONF_CHECK_TIMEOUT, DEFAULT_CHECK_TIMEOUT)): TIMEOUT,
+        vol.Optional(CONF_UPGRADE_TIMEOUT, default=defaults.get(CONF_UPGRADE_TIMEOUT, DEFAULT_UPGRADE_TIMEOUT)): TIMEOUT,
+        vol.Optional(CONF_DEBUG, default=defaults.get(CONF_DEBUG, False)): bool,
+    })
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Linux Updates."""
 
@@ -56,7 +107,13 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle the initial step."""
+        """Handle the initial step: a single server or a fleet."""
+        return self.async_show_menu(step_id="user", menu_options=["host", "fleet"])
+
+    async def async_step_host(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a single server."""
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -72,12 +129,39 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             vol.Optional(CONF_PASSWORD): str,
             vol.Optional(CONF_SSH_KEY): str,
             vol.Optional(CONF_PORT, default=22): int,
+            vol.Optional(CONF_JUMP_HOST, default=""): str,
             vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): int, # Nytt fält
+            vol.Optional(CONF_USE_HELPER, default=False): bool,
+            vol.Optional(CONF_PUSH_MODE, default=False): bool,
+            vol.Optional(CONF_PREFETCH_HOUR): PREFETCH_HOUR,
+            vol.Optional(CONF_APT_LISTS_MAX_AGE, default=DEFAULT_APT_LISTS_MAX_AGE): int,
+            vol.Optional(CONF_CONNECT_TIMEOUT, default=DEFAULT_CONNECT_TIMEOUT): TIMEOUT,
+            vol.Optional(CONF_CHECK_TIMEOUT, default=DEFAULT_CHECK_TIMEOUT): TIMEOUT,
+            vol.Optional(CONF_UPGRADE_TIMEOUT, default=DEFAULT_UPGRADE_TIMEOUT): TIMEOUT,
             vol.Optional(CONF_DEBUG, default=False): bool,
         })
 
         return self.async_show_form(
-            step_id="user", data_schema=schema, errors=errors
+            step_id="host", data_schema=schema, errors=errors
+        )
+
+    async def async_step_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle adding a fleet of servers polled by one entry."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                info = await validate_fleet_input(self.hass, user_input)
+                return self.async_create_entry(title=info["title"], data=user_input)
+            except ValueError:
+                errors["base"] = "invalid_hosts"
+            except Exception:
+                errors["base"] = "cannot_connect"
+
+        return self.async_show_form(
+            step_id="fleet", data_schema=_fleet_schema(user_input or {}), errors=errors
         )
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
@@ -91,6 +175,9 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        if is_fleet_config(self._config_entry.data):
+            return await self.async_step_fleet(user_input)
+
         errors: dict[str, str] = {}
 
         if user_input is not None:
@@ -115,7 +202,15 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             vol.Optional(CONF_PASSWORD, default=current_data.get(CONF_PASSWORD)): str,
             vol.Optional(CONF_SSH_KEY, default=current_data.get(CONF_SSH_KEY)): str,
             vol.Optional(CONF_PORT, default=current_data.get(CONF_PORT, 22)): int,
+            vol.Optional(CONF_JUMP_HOST, default=current_data.get(CONF_JUMP_HOST, "")): str,
             vol.Optional(CONF_SCAN_INTERVAL, default=current_data.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)): int, # Nytt fält
+            vol.Optional(CONF_USE_HELPER, default=current_data.get(CONF_USE_HELPER, False)): bool,
+            vol.Optional(CONF_PUSH_MODE, default=current_data.get(CONF_PUSH_MODE, False)): bool,
+            vol.Optional(CONF_PREFETCH_HOUR, description={"suggested_value": current_data.get(CONF_PREFETCH_HOUR)}): PREFETCH_HOUR,
+            vol.Optional(CONF_APT_LISTS_MAX_AGE, default=current_data.get(CONF_APT_LISTS_MAX_AGE, DEFAULT_APT_LISTS_MAX_AGE)): int,
+            vol.Optional(CONF_CONNECT_TIMEOUT, default=current_data.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)): TIMEOUT,
+            vol.Optional(CONF_CHECK_TIMEOUT, default=current_data.get(CONF_CHECK_TIMEOUT, DEFAULT_CHECK_TIMEOUT)): TIMEOUT,
+            vol.Optional(CONF_UPGRADE_TIMEOUT, default=current_data.get(CONF_UPGRADE_TIMEOUT, DEFAULT_UPGRADE_TIMEOUT)): TIMEOUT,
             vol.Optional(CONF_DEBUG, default=current_data.get(CONF_DEBUG, False)): bool,
         })
 
@@ -123,4 +218,32 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             step_id="init",
             data_schema=schema,
             errors=errors
-        )
\ No newline at end of file
+        )
+
+    async def async_step_fleet(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options of a fleet entry."""
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            try:
+                await validate_fleet_input(self.hass, user_input)
+
+                self.hass.config_entries.async_update_entry(
+                    self._config_entry,
+                    data=user_input
+                )
+
+                return self.async_create_entry(title="", data=user_input)
+
+            except ValueError:
+                errors["base"] = "invalid_hosts"
+            except Exception:
+                errors["base"] = "cannot_connect"
+
+        return self.async_show_form(
+            step_id="fleet",
+            data_schema=_fleet_schema(user_input or self._config_entry.data),
+            errors=errors
+        )
@@ -0,0 +1,563 @@
+"""Version: 1.6.1 | Datum: 2026-10-18
+Pooled SSH connections for Linux Updates.
+
+One authenticated connection is kept alive per host and every command runs
+on its own channel over that connection. Hosts behind a jump host are
+reached through one shared connection to it, each host's connection being a
+tunneled channel of that one.
+
+asyncssh (and with it the cryptography stack) is imported in the executor
+the first time a connection is needed, not when the integration is loaded.
+Its errors are raised as SSHError so other modules never have to import it.
+"""
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import os
+import socket
+import time
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, AsyncIterator
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_USERNAME,
+    CONF_PASSWORD,
+    CONF_SSH_KEY,
+    CONF_JUMP_HOST,
+    CONF_CONNECT_TIMEOUT,
+    DATA_CONNECTIONS,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_PORT,
+    SSH_KEEPALIVE_INTERVAL,
+    SSH_KEEPALIVE_COUNT_MAX,
+    SSH_IDLE_TIMEOUT,
+    SSH_EVICT_INTERVAL,
+)
+from .timing import (
+    OperationTimer,
+    PHASE_DNS,
+    PHASE_TCP,
+    PHASE_HANDSHAKE,
+    PHASE_REMOTE,
+    measure,
+)
+
+if TYPE_CHECKING:
+    import asyncssh
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SSHError(Exception):
+    """An SSH connection, channel or remote command failed."""
+
+
+class SSHTimeoutError(SSHError):
+    """Connecting or a remote command took longer than allowed."""
+
+
+@asynccontextmanager
+async def async_deadline(seconds: float | None, message: str) -> AsyncIterator[None]:
+    """Cancel the enclosed block after ``seconds`` and raise SSHTimeoutError.
+
+    Other timeouts from inside the block (e.g. a TCP connect) pass through
+    unchanged. ``None`` means no limit.
+    """
+    timeout = asyncio.timeout(seconds)
+    try:
+        async with timeout:
+            yield
+    except TimeoutError as err:
+        if not timeout.expired():
+            raise
+        raise SSHTimeoutError(message) from err
+
+
+def _stop_process(process) -> None:
+    """Ask the remote command to terminate and close its channel.
+
+    Used when the caller gives up on a command (timeout or cancellation), so
+    it does not keep running on the host.
+    """
+    try:
+        process.terminate()
+    except Exception:  # pylint: disable=broad-except
+        # Channel already closed or signals not supported by the server
+        pass
+    process.close()
+
+
+async def _async_exec(conn, command: str, check: bool = False, **kwargs: Any):
+    """Run a command to completion, stopping it on the host if cancelled."""
+    process = await conn.create_process(command, **kwargs)
+    try:
+        return await process.wait(check=check)
+    except BaseException:
+        if process.exit_status is None:
+            _stop_process(process)
+        raise
+    finally:
+        process.close()
+
+
+def connection_key(config: dict[str, Any]) -> tuple:
+    """Return the pool key for a host config.
+
+    Credentials are part of the key so that a changed password or key file
+    never reuses a connection authenticated with the old ones.
+    """
+    return (
+        config.get(CONF_HOST),
+        config.get(CONF_PORT, DEFAULT_PORT),
+        config.get(CONF_USERNAME),
+        config.get(CONF_PASSWORD),
+        config.get(CONF_SSH_KEY),
+        config.get(CONF_JUMP_HOST) or None,
+    )
+
+
+def split_host_port(address: str) -> tuple[str, int | None]:
+    """Split ``host[:port]`` into host and port, None if no port is given.
+
+    IPv6 addresses are written bare (``fe80::1``) or in brackets, which is
+    required to add a port (``[fe80::1]:22``). Raises ValueError for a port
+    that isn't a number.
+    """
+    if address.startswith("["):
+        host, _, rest = address[1:].partition("]")
+        port = rest[1:] if rest.startswith(":") else None
+        if rest and port is None:
+            raise ValueError(f"Invalid address '{address}'")
+    elif address.count(":") == 1:
+        host, port = address.split(":")
+    else:
+        # Plain name, IPv4 or bare IPv6
+        host, port = address, None
+    if port is None:
+        return host, None
+    if not port.isdigit():
+        raise ValueError(f"Invalid port in '{address}'")
+    return host, int(port)
+
+
+def format_host_port(host: str, port: int) -> str:
+    """Return ``host:port``, with IPv6 addresses in brackets."""
+    return f"[{host}]:{port}" if ":" in host else f"{host}:{port}"
+
+
+def jump_config(config: dict[str, Any]) -> dict[str, Any] | None:
+    """Return the connection config of a host's jump host, or None.
+
+    The jump host is given as ``[user@]host[:port]``. The user defaults to the
+    host's own and the same password and key file are used for both.
+    """
+    if not (jump := (config.get(CONF_JUMP_HOST) or "").strip()):
+        return None
+    username, _, address = jump.rpartition("@")
+    host, port = split_host_port(address)
+    return {
+        CONF_HOST: host,
+        CONF_PORT: port or DEFAULT_PORT,
+        CONF_USERNAME: username or config.get(CONF_USERNAME),
+        CONF_PASSWORD: config.get(CONF_PASSWORD),
+        CONF_SSH_KEY: config.get(CONF_SSH_KEY),
+        CONF_CONNECT_TIMEOUT: config.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+    }
+
+
+@callback
+def get_connection_manager(hass: HomeAssistant) -> SSHConnectionManager:
+    """Return the shared connection manager, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_CONNECTIONS not in domain_data:
+        domain_data[DATA_CONNECTIONS] = SSHConnectionManager(hass)
+    return domain_data[DATA_CONNECTIONS]
+
+
+def _tunnel_owner(key: tuple) -> tuple:
+    """Return the owner id a tunneled connection holds on its jump host."""
+    return ("tunnel", key)
+
+
+class _PooledConnection:
+    """A live connection together with its bookkeeping."""
+
+    def __init__(self, conn: asyncssh.SSHClientConnection, tunnel_key: tuple | None = None) -> None:
+        self.conn = conn
+        # Pool key of the jump host connection this one is tunneled through
+        self.tunnel_key = tunnel_key
+        self.active = 0
+        self.last_used = time.monotonic()
+        self.closed = False
+
+
+def _load_client_keys(
+    asyncssh, path: str, cached_mtime: float | None
+) -> tuple[float, list[asyncssh.SSHKeyPair] | None]:
+    """Load a private key (and its certificate, if any) unless it is unchanged.
+
+    Runs in the executor. Returns the file's mtime together with the parsed
+    key pairs, or None instead of the key pairs if ``cached_mtime`` is still
+    current.
+    """
+    mtime = os.stat(path).st_mtime
+    if mtime == cached_mtime:
+        return mtime, None
+    return mtime, asyncssh.load_keypairs([path])
+
+
+class SSHConnectionManager:
+    """Keep one authenticated SSH connection alive per host."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._pool: dict[tuple, _PooledConnection] = {}
+        self._owners: dict[tuple, set[str | tuple]] = {}
+        self._locks: dict[tuple, asyncio.Lock] = {}
+        # Parsed client keys per key file, shared by every host using the file
+        self._keys: dict[str, tuple[float, list[asyncssh.SSHKeyPair]]] = {}
+        self._key_locks: dict[str, asyncio.Lock] = {}
+        self._unsub_evict = None
+        self._unsub_stop = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_handle_stop
+        )
+        self.handshakes = 0
+        self._asyncssh = None
+
+    async def _async_import_asyncssh(self):
+        """Return the asyncssh module, importing it in the executor on first use."""
+        if self._asyncssh is None:
+            self._asyncssh = await self.hass.async_add_import_executor_job(
+                importlib.import_module, "asyncssh"
+            )
+        return self._asyncssh
+
+    @callback
+    def async_register(self, config: dict[str, Any], owner: str) -> None:
+        """Mark a connection as owned so it is never evicted for being idle."""
+        key = connection_key(config)
+        self._owners.setdefault(key, set()).add(owner)
+
+    async def async_release(self, config: dict[str, Any], owner: str) -> None:
+        """Drop an owner and close the connection when nobody uses it anymore."""
+        key = connection_key(config)
+        owners = self._owners.get(key, set())
+        owners.discard(owner)
+        if owners:
+            return
+        self._owners.pop(key, None)
+        if (pooled := self._pool.get(key)) is not None:
+            await self._async_close(key, pooled)
+
+    @asynccontextmanager
+    async def async_connection(
+        self, config: dict[str, Any], timer: OperationTimer | None = None
+    ) -> AsyncIterator[asyncssh.SSHClientConnection]:
+        """Borrow the pooled connection for a host.
+
+        The connection is protected from idle eviction while borrowed and is
+        dropped from the pool if it turns out to be dead. If a new connection
+        has to be opened its phases are recorded on ``timer``. asyncssh errors
+        raised while borrowing it come out as SSHError.
+        """
+        asyncssh = await self._async_import_asyncssh()
+        try:
+            async with self._async_borrow(config, timer) as conn:
+                yield conn
+        except asyncssh.Error as err:
+            raise SSHError(str(err) or type(err).__name__) from err
+
+    @asynccontextmanager
+    async def async_process(
+        self, config: dict[str, Any], command: str, timer: OperationTimer | None = None
+    ) -> AsyncIterator[asyncssh.SSHClientProcess]:
+        """Start a command whose output (stdout and stderr merged) is streamed."""
+        asyncssh = await self._async_import_asyncssh()
+        async with self.async_connection(config, timer) as conn:
+            with measure(timer, PHASE_REMOTE):
+                async with conn.create_process(command, stderr=asyncssh.STDOUT) as process:
+                    try:
+                        yield process
+                    except BaseException:
+                        # Timed out or cancelled, don't leave it running
+                        if process.exit_status is None:
+                            _stop_process(process)
+                        raise
+
+    @asynccontextmanager
+    async def _async_borrow(
+        self, config: dict[str, Any], timer: OperationTimer | None
+    ) -> AsyncIterator[asyncssh.SSHClientConnection]:
+        """Borrow the pooled connection, raising asyncssh's own errors."""
+        asyncssh = await self._async_import_asyncssh()
+        key = connection_key(config)
+        pooled = await self._async_acquire(key, config, timer)
+        pooled.active += 1
+        try:
+            yield pooled.conn
+        except (asyncssh.DisconnectError, BrokenPipeError):
+            self._discard(key, pooled)
+            raise
+        finally:
+            pooled.active -= 1
+            pooled.last_used = time.monotonic()
+
+    async def async_run(
+        self,
+        config: dict[str, Any],
+        command: str,
+        timer: OperationTimer | None = None,
+        **kwargs: Any,
+    ) -> asyncssh.SSHCompletedProcess:
+        """Run a command on its own channel, reconnecting once if needed.
+
+        Only a reused connection is retried: if it went stale while pooled the
+        command never reached the server, whereas a failure on a fresh
+        connection is a real error.
+        """
+        asyncssh = await self._async_import_asyncssh()
+        # Errors raised when a pooled connection died while it sat idle
+        retryable = (asyncssh.ChannelOpenError, asyncssh.ConnectionLost, BrokenPipeError)
+        reused = connection_key(config) in self._pool
+        try:
+            try:
+                async with self._async_borrow(config, timer) as conn:
+                    with measure(timer, PHASE_REMOTE):
+                        return await _async_exec(conn, command, **kwargs)
+            except retryable as err:
+                if not reused:
+                    raise
+                self.invalidate(config)
+                _LOGGER.debug(
+                    "Pooled connection to %s unusable (%s), reconnecting",
+                    config.get(CONF_HOST), err,
+                )
+            async with self._async_borrow(config, timer) as conn:
+                with measure(timer, PHASE_REMOTE):
+                    return await _async_exec(conn, command, **kwargs)
+        except asyncssh.Error as err:
+            raise SSHError(str(err) or type(err).__name__) from err
+
+    def invalidate(self, config: dict[str, Any]) -> None:
+        """Forget the pooled connection for a host, e.g. after a reboot."""
+        key = connection_key(config)
+        if (pooled := self._pool.get(key)) is not None:
+            self._discard(key, pooled)
+
+    async def async_close(self) -> None:
+        """Close every pooled connection."""
+        if self._unsub_evict is not None:
+            self._unsub_evict()
+            self._unsub_evict = None
+        for key, pooled in list(self._pool.items()):
+            await self._async_close(key, pooled)
+
+    async def _async_acquire(
+        self, key: tuple, config: dict[str, Any], timer: OperationTimer | None
+    ) -> _PooledConnection:
+        """Return a live pooled connection, connecting if necessary."""
+        pooled = self._pool.get(key)
+        if pooled is not None and not pooled.closed:
+            return pooled
+
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            pooled = self._pool.get(key)
+            if pooled is not None and not pooled.closed:
+                return pooled
+
+            timeout = config.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT)
+            async with async_deadline(
+                timeout, f"Connecting to {config.get(CONF_HOST)} timed out after {timeout} s"
+            ):
+                conn, tunnel_key = await self._async_open(key, config, timer)
+            pooled = _PooledConnection(conn, tunnel_key)
+            self._pool[key] = pooled
+            self.hass.async_create_background_task(
+                self._async_watch(key, pooled),
+                f"{DOMAIN} ssh watch {config.get(CONF_HOST)}",
+            )
+            self._start_eviction()
+            return pooled
+
+    async def _async_open(
+        self, key: tuple, config: dict[str, Any], timer: OperationTimer | None
+    ) -> tuple[asyncssh.SSHClientConnection, tuple | None]:
+        """Connect directly or through the jump host.
+
+        Returns the connection and the pool key of its jump host, if any.
+        """
+        if (jump := jump_config(config)) is None:
+            return await self._async_connect(config, timer), None
+
+        tunnel_key = connection_key(jump)
+        # The tunnel is owned by every connection through it and closed
+        # together with the last one
+        self._owners.setdefault(tunnel_key, set()).add(_tunnel_owner(key))
+        try:
+            # Reaching the host through the jump host counts as its TCP phase
+            with measure(timer, PHASE_TCP):
+                tunnel = await self._async_acquire(tunnel_key, jump, None)
+            return await self._async_connect(config, timer, tunnel.conn), tunnel_key
+        except BaseException:
+            self._release_tunnel(key, tunnel_key)
+            raise
+
+    async def _async_connect(
+        self,
+        config: dict[str, Any],
+        timer: OperationTimer | None = None,
+        tunnel: asyncssh.SSHClientConnection | None = None,
+    ) -> asyncssh.SSHClientConnection:
+        """Open and authenticate a new connection.
+
+        Name resolution and the TCP connect are done here rather than inside
+        asyncssh so that each phase can be timed on its own. Through a
+        ``tunnel`` both are left to the jump host.
+        """
+        asyncssh = await self._async_import_asyncssh()
+        host = config.get(CONF_HOST)
+        port = config.get(CONF_PORT, DEFAULT_PORT)
+        ssh_key = config.get(CONF_SSH_KEY)
+        client_keys = await self._async_client_keys(ssh_key) if ssh_key else None
+        options = {
+            "username": config.get(CONF_USERNAME),
+            "password": config.get(CONF_PASSWORD) or None,
+            "client_keys": client_keys,
+            "known_hosts": None,
+            "keepalive_interval": SSH_KEEPALIVE_INTERVAL,
+            "keepalive_count_max": SSH_KEEPALIVE_COUNT_MAX,
+        }
+
+        if tunnel is not None:
+            with measure(timer, PHASE_HANDSHAKE):
+                conn = await asyncssh.connect(host, port=port, tunnel=tunnel, **options)
+            self.handshakes += 1
+            _LOGGER.debug("Opened pooled SSH connection to %s through a jump host", host)
+            return conn
+
+        with measure(timer, PHASE_DNS):
+            addrinfo = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        with measure(timer, PHASE_TCP):
+            sock = await self._async_open_socket(addrinfo)
+        try:
+            with measure(timer, PHASE_HANDSHAKE):
+                conn = await asyncssh.connect(host, port=port, sock=sock, **options)
+        except BaseException:
+            sock.close()
+            raise
+        self.handshakes += 1
+        _LOGGER.debug("Opened pooled SSH connection to %s", host)
+        return conn
+
+    async def _async_client_keys(self, path: str) -> list[asyncssh.SSHKeyPair]:
+        """Return the parsed key pairs for a key file.
+
+        Reading, parsing and decrypting keys is blocking work, so it is done
+        in the executor and only again when the file's mtime changes.
+        """
+        asyncssh = await self._async_import_asyncssh()
+        lock = self._key_locks.setdefault(path, asyncio.Lock())
+        async with lock:
+            cached_mtime, keys = self._keys.get(path, (None, None))
+            try:
+                mtime, loaded = await self.hass.async_add_executor_job(
+                    _load_client_keys, asyncssh, path, cached_mtime
+                )
+            except (asyncssh.KeyImportError, asyncssh.KeyEncryptionError) as err:
+                raise OSError(f"Cannot load SSH key {path}: {err}") from err
+            if loaded is not None:
+                _LOGGER.debug("Loaded SSH key %s", path)
+                keys = loaded
+                self._keys[path] = (mtime, keys)
+            return keys
+
+    @staticmethod
+    async def _async_open_socket(addrinfo: list) -> socket.socket:
+        """Connect a TCP socket to the first address that answers."""
+        loop = asyncio.get_running_loop()
+        last_error: OSError | None = None
+        for family, type_, proto, _canonname, address in addrinfo:
+            sock = socket.socket(family, type_, proto)
+            sock.setblocking(False)
+            try:
+                await loop.sock_connect(sock, address)
+            except OSError as err:
+                sock.close()
+                last_error = err
+                continue
+            except BaseException:
+                sock.close()
+                raise
+            return sock
+        raise last_error or OSError(f"No address to connect to in {addrinfo}")
+
+    async def _async_watch(self, key: tuple, pooled: _PooledConnection) -> None:
+        """Drop the connection from the pool as soon as it closes."""
+        await pooled.conn.wait_closed()
+        self._discard(key, pooled)
+
+    def _discard(self, key: tuple, pooled: _PooledConnection) -> None:
+        """Remove a connection from the pool and close it in the background."""
+        if pooled.closed:
+            return
+        pooled.closed = True
+        if self._pool.get(key) is pooled:
+            del self._pool[key]
+        pooled.conn.close()
+        if pooled.tunnel_key is not None:
+            self._release_tunnel(key, pooled.tunnel_key)
+
+    def _release_tunnel(self, key: tuple, tunnel_key: tuple) -> None:
+        """Drop a connection's hold on its jump host, closing it if it was the last."""
+        owners = self._owners.get(tunnel_key, set())
+        owners.discard(_tunnel_owner(key))
+        if owners:
+            return
+        self._owners.pop(tunnel_key, None)
+        if (tunnel := self._pool.get(tunnel_key)) is not None and not tunnel.active:
+            _LOGGER.debug("Closing jump host connection to %s", tunnel_key[0])
+            self._discard(tunnel_key, tunnel)
+
+    async def _async_close(self, key: tuple, pooled: _PooledConnection) -> None:
+        """Close a connection and wait for it to go away."""
+        self._discard(key, pooled)
+        await pooled.conn.wait_closed()
+
+    def _start_eviction(self) -> None:
+        """Start the periodic idle check if it is not already running."""
+        if self._unsub_evict is None:
+            self._unsub_evict = async_track_time_interval(
+                self.hass, self._async_evict_idle, timedelta(seconds=SSH_EVICT_INTERVAL)
+            )
+
+    @callback
+    def _async_evict_idle(self, _now=None) -> None:
+        """Close unowned connections that have been idle for too long."""
+        deadline = time.monotonic() - SSH_IDLE_TIMEOUT
+        for key, pooled in list(self._pool.items()):
+            if not self._owners.get(key) and not pooled.active and pooled.last_used < deadline:
+                _LOGGER.debug("Evicting idle SSH connection to %s", key[0])
+                self._discard(key, pooled)
+
+        if not self._pool and self._unsub_evict is not None:
+            self._unsub_evict()
+            self._unsub_evict = None
+
+    async def _async_handle_stop(self, _event: Event) -> None:
+        """Close all connections when Home Assistant stops."""
+        self._unsub_stop = None
+        await self.async_close()
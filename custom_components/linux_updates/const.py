@@ -1,4 +1,4 @@
-"""Version: 1.10.0 | Datum: 2025-12-19
+"""Version: 1.31.3 | Datum: 2026-10-18
 Constants for the Linux Updates integration.
 """
 
@@ -11,27 +11,210 @@ CONF_PASSWORD = "password"
 CONF_SSH_KEY = "ssh_key_file"
 CONF_DEBUG = "debug_logging"
 CONF_SCAN_INTERVAL = "scan_interval"
+CONF_USE_HELPER = "use_remote_helper"
+CONF_FLEET_HOSTS = "fleet_hosts"
+CONF_INVENTORY_FILE = "inventory_file"
+CONF_FLEET_CONCURRENCY = "fleet_concurrency"
+CONF_PREFETCH_HOUR = "prefetch_hour"  # Timme (0-23) för automatisk prefetch, tomt = av
+CONF_APT_LISTS_MAX_AGE = "apt_lists_max_age"  # Minuter, 0 = kör alltid apt-get update
+CONF_JUMP_HOST = "jump_host"  # [användare@]värd[:port] för bastion/ProxyJump, tomt = direkt
+CONF_CONNECT_TIMEOUT = "connect_timeout"  # Sekunder
+CONF_CHECK_TIMEOUT = "check_timeout"  # Sekunder
+CONF_UPGRADE_TIMEOUT = "upgrade_timeout"  # Sekunder
+CONF_PUSH_MODE = "push_mode"  # Bevaka ändringar över en öppen SSH-kanal i stället för polling
 
 DEFAULT_PORT = 22
 DEFAULT_NAME = "Linux Server"
 DEFAULT_SCAN_INTERVAL = 6
+DEFAULT_FLEET_CONCURRENCY = 10
+DEFAULT_APT_LISTS_MAX_AGE = 60
+DEFAULT_CONNECT_TIMEOUT = 20
+DEFAULT_CHECK_TIMEOUT = 180
+DEFAULT_UPGRADE_TIMEOUT = 3600  # Generöst, en avbruten dpkg kräver 'dpkg --configure -a'
+
+# Persisted state (senaste kända resultat per värd)
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10  # Sekunder, samlar ihop sparningar från många värdar
+
+# hass.data[DOMAIN] keys for objects shared between config entries
+DATA_CONNECTIONS = "connections"
+DATA_ROLLING_UPGRADE = "rolling_upgrade"
+DATA_PACKAGE_INDEX = "package_index"
+
+# SSH connection pool
+SSH_KEEPALIVE_INTERVAL = 60  # Sekunder mellan keepalive-förfrågningar
+SSH_KEEPALIVE_COUNT_MAX = 3
+SSH_IDLE_TIMEOUT = 300  # Anslutningar utan ägare (t.ex. från config flow) stängs efter 5 min
+SSH_EVICT_INTERVAL = 60
+
+# Adaptive poll scheduling (sekunder om inget annat anges)
+POLL_JITTER = 0.1  # Fast per-värd spridning, +/- 10 % av intervallet
+POLL_MIN_INTERVAL = 900
+POLL_RETRY_INTERVAL = 120  # Första nytt försök efter SSH-fel, dubblas sedan
+POLL_FRESH_LISTS_AGE = 6 * 3600  # apt-listor yngre än så räknas som nyss ändrade
+POLL_FRESH_FACTOR = 0.25  # Andel av intervallet när listorna är färska
+POLL_QUIET_STEP = 0.25  # Intervallet förlängs så här mycket per kontroll utan ändringar
+POLL_QUIET_MAX_FACTOR = 2.0
+
+# Streamed upgrade
+UPGRADE_OUTPUT_LINES = 200  # Endast de sista raderna av apt-utdatan sparas
+UPGRADE_PROGRESS_INTERVAL = 2  # Sekunder mellan uppdateringar av progress-sensorerna
+UPGRADE_HISTORY_SIZE = 20  # Sparade uppdateringar per värd för tidsprognosen
+
+# Package manager lock (t.ex. när unattended-upgrades körs)
+APT_LOCK_TIMEOUT = 30  # Sekunder apt själv väntar på dpkg-låset (DPkg::Lock::Timeout)
+LOCK_RETRY_ATTEMPTS = 3  # Försök totalt innan uppdateringen räknas som misslyckad
+LOCK_RETRY_DELAY = 60  # Sekunder mellan försöken
+
+# apt history.log tailing (upgrades by unattended-upgrades or by hand)
+APT_HISTORY_DIR = "/var/log/apt"
+APT_HISTORY_MAX_BYTES = 256 * 1024  # Högst så mycket ny logg hämtas per kontroll
+
+# Push mode (apt only)
+PUSH_DEBOUNCE = 30  # Sekunder utan nya händelser innan kontrollen körs
+PUSH_STAT_INTERVAL = 10  # Sekunder mellan stat-anrop när inotifywait saknas
+PUSH_RETRY_INITIAL = 30  # Första återanslutningen efter att kanalen brutits, dubblas sedan
+PUSH_RETRY_MAX = 1800
+PUSH_SAFETY_INTERVAL = 24 * 3600  # Kontroll ändå så här ofta medan kanalen är uppe
+
+# Prefetch
+PREFETCH_SPREAD = 1800  # Sekunder, servrarna sprids ut efter prefetch-timmen
+PREFETCH_MAX_AGE = 24 * 3600  # Äldre prefetch används inte av uppgraderingen
+
+# Rolling upgrades
+DEFAULT_ROLLING_PARALLELISM = 5  # Servrar per våg
+DEFAULT_CANARY_COUNT = 1  # Servrar i första vågen om ingen kanariegrupp anges
+DEFAULT_REBOOT_TIMEOUT = 600  # Sekunder att vänta på att en server kommer tillbaka
+REBOOT_GRACE_PERIOD = 15  # Sekunder innan första försöket om boot-id saknas
+REBOOT_NEVER = "never"
+REBOOT_IF_REQUIRED = "if_required"
+REBOOT_ALWAYS = "always"
+
+# Reboot tracking
+REBOOT_RECONNECT_INITIAL = 2  # Sekunder till första återanslutningsförsöket, dubblas sedan
+REBOOT_RECONNECT_MAX = 30
+REBOOT_TRACK_TIMEOUT = 1800  # Ge upp spårningen efter 30 min, vanlig polling tar över
+
+# Profiling (diagnostic sensors and diagnostics download)
+TIMING_SAMPLES = 100  # Mätningar per fas i det rullande fönstret
+RAW_OUTPUT_SAMPLES = 5  # Antal senaste råa kommandoutdata som sparas
+RAW_OUTPUT_MAX_CHARS = 4000  # Endast slutet av varje utdata sparas
 
 # Commands
 # VIKTIGT: Vi använder fullständiga sökvägar (/usr/bin/apt-get) för att matcha sudoers exakt.
 CMD_CHECK_UPDATES = "LANG=C /usr/bin/apt-get -s -o Debug::NoLocking=true upgrade"
 
-CMD_LIST_PACKAGES = "LANG=C /usr/bin/apt list --upgradable"
+# Cheap fingerprint of the apt lists and dpkg status (mtime:size). If it hasn't
+# changed since the last check the apt simulation above is skipped.
+# The reboot-required flag and the packages that set it are appended to the
+# same output, so the reboot state is fresh after every check.
+CMD_REBOOT_REQUIRED = (
+    "if [ -f /var/run/reboot-required ]; then echo 'reboot-required: yes'; "
+    "cat /var/run/reboot-required.pkgs 2>/dev/null; else echo 'reboot-required: no'; fi"
+)
+CMD_FINGERPRINT = f"date +%s; stat -c %Y:%s /var/lib/apt/lists /var/lib/dpkg/status; {CMD_REBOOT_REQUIRED}"
+
+# apt-get update without the translated package descriptions (Translation-*
+# indexes), which nothing here reads. pdiffs stay on, they are the smaller
+# download on slow links.
+CMD_APT_UPDATE = "sudo /usr/bin/apt-get update -o Acquire::Languages=none"
+
+# True if the apt lists (or the apt-daily success stamp) are younger than
+# {minutes}, then the apt-get update above is skipped.
+CMD_APT_LISTS_FRESH = (
+    '[ -n "$(find /var/lib/apt/lists /var/lib/apt/periodic/update-success-stamp '
+    '-maxdepth 0 -mmin -{minutes} 2>/dev/null)" ]'
+)
+
+# Upgrades and prefetches run in the C locale: the progress, lock and
+# download size parsers match apt's (and the others') English output.
+CMD_C_LOCALE = "export LANG=C LC_ALL=C;"
 
 # Update command: Clean, Update, Upgrade (Safe), Autoremove
 # Vi använder fullständiga sökvägar här också.
 # Vi tog bort DEBIAN_FRONTEND=noninteractive och använder flaggan -y som oftast räcker för safe upgrade.
-CMD_UPGRADE = "sudo /usr/bin/apt-get update && sudo /usr/bin/apt-get upgrade -y && sudo /usr/bin/apt-get autoremove -y"
+# Lock::Timeout makes apt wait a bit for the dpkg lock instead of failing at once.
+CMD_UPGRADE = (
+    f"{CMD_C_LOCALE} {CMD_APT_UPDATE} && sudo /usr/bin/apt-get -o DPkg::Lock::Timeout={APT_LOCK_TIMEOUT} upgrade -y "
+    f"&& sudo /usr/bin/apt-get -o DPkg::Lock::Timeout={APT_LOCK_TIMEOUT} autoremove -y"
+)
+
+# Prefetch: ladda ner paketen i förväg utan att installera dem. Efter en
+# prefetch installeras de nedladdade paketen utan ny 'apt-get update'.
+CMD_PREFETCH = (
+    f"{CMD_C_LOCALE} {CMD_APT_UPDATE} && sudo /usr/bin/apt-get "
+    f"-o DPkg::Lock::Timeout={APT_LOCK_TIMEOUT} upgrade -y --download-only"
+)
+CMD_UPGRADE_PREFETCHED = (
+    f"{CMD_C_LOCALE} sudo /usr/bin/apt-get -o DPkg::Lock::Timeout={APT_LOCK_TIMEOUT} upgrade -y "
+    f"&& sudo /usr/bin/apt-get -o DPkg::Lock::Timeout={APT_LOCK_TIMEOUT} autoremove -y"
+)
 
 # Reboot command
 # Även här måste vi matcha sudoers exakt (/usr/sbin/reboot)
 CMD_REBOOT = "sudo /usr/sbin/reboot"
 
+# Changes on every boot, tells a host that came back from one that never went down
+CMD_BOOT_ID = "cat /proc/sys/kernel/random/boot_id"
+
+# Push mode watcher: prints one line per change of the dpkg database or the
+# apt lists. Uses inotifywait (inotify-tools) if installed, otherwise a cheap
+# stat loop. The first line tells which.
+CMD_WATCH = (
+    "if command -v inotifywait >/dev/null 2>&1; then echo 'watch: inotify'; "
+    "inotifywait -mq -e close_write,moved_to,delete --exclude lock --format %w%f "
+    "/var/lib/dpkg /var/lib/apt/lists; fi; "
+    "echo 'watch: stat'; prev=$(stat -c %Y:%s /var/lib/dpkg/status /var/lib/apt/lists); "
+    f"while sleep {PUSH_STAT_INTERVAL}; do cur=$(stat -c %Y:%s /var/lib/dpkg/status /var/lib/apt/lists); "
+    '[ "$cur" = "$prev" ] || { echo $cur; prev=$cur; }; done'
+)
+
+# Other package managers. Every check only reads the local metadata cache, no
+# refresh and no lock, so polling never competes with the host's own updates.
+# dash and busybox ash only look up the first name given to 'command -v'
+CMD_DETECT_PACKAGE_MANAGER = 'for c in apt-get dnf yum zypper pacman apk; do command -v "$c"; done'
+
+CMD_DNF_CHECK_UPDATES = "LANG=C /usr/bin/dnf -q check-update --cacheonly"
+CMD_DNF_UPGRADE = f"{CMD_C_LOCALE} sudo /usr/bin/dnf upgrade -y"
+CMD_DNF_PREFETCH = f"{CMD_C_LOCALE} sudo /usr/bin/dnf upgrade -y --downloadonly"
+CMD_DNF_UPGRADE_PREFETCHED = f"{CMD_C_LOCALE} sudo /usr/bin/dnf upgrade -y --cacheonly"
+CMD_YUM_CHECK_UPDATES = "LANG=C /usr/bin/yum -q check-update --cacheonly"
+CMD_YUM_UPGRADE = f"{CMD_C_LOCALE} sudo /usr/bin/yum update -y"
+CMD_YUM_PREFETCH = f"{CMD_C_LOCALE} sudo /usr/bin/yum update -y --downloadonly"
+CMD_YUM_UPGRADE_PREFETCHED = f"{CMD_C_LOCALE} sudo /usr/bin/yum update -y --cacheonly"
+CMD_ZYPPER_CHECK_UPDATES = "LANG=C ZYPP_READONLY_HACK=1 /usr/bin/zypper --no-refresh -q list-updates"
+CMD_ZYPPER_UPGRADE = f"{CMD_C_LOCALE} sudo /usr/bin/zypper --non-interactive update"
+CMD_ZYPPER_PREFETCH = f"{CMD_C_LOCALE} sudo /usr/bin/zypper --non-interactive update --download-only"
+CMD_ZYPPER_UPGRADE_PREFETCHED = f"{CMD_C_LOCALE} sudo /usr/bin/zypper --non-interactive --no-refresh update"
+CMD_PACMAN_CHECK_UPDATES = "LANG=C /usr/bin/pacman -Qu"
+CMD_PACMAN_UPGRADE = f"{CMD_C_LOCALE} sudo /usr/bin/pacman -Syu --noconfirm"
+CMD_PACMAN_PREFETCH = f"{CMD_C_LOCALE} sudo /usr/bin/pacman -Syuw --noconfirm"
+CMD_PACMAN_UPGRADE_PREFETCHED = f"{CMD_C_LOCALE} sudo /usr/bin/pacman -Su --noconfirm"
+CMD_APK_CHECK_UPDATES = "/sbin/apk version -l '<'"
+CMD_APK_UPGRADE = f"{CMD_C_LOCALE} sudo /sbin/apk upgrade -U"
+
+# Events
+EVENT_PACKAGES_CHANGED = f"{DOMAIN}_packages_changed"
+EVENT_ROLLING_UPGRADE = f"{DOMAIN}_rolling_upgrade"
+
+# Services & websocket
+SERVICE_GET_PACKAGES = "get_packages"
+SERVICE_ROLLING_UPGRADE = "rolling_upgrade"
+SERVICE_FIND_PACKAGE = "find_package"
+WS_TYPE_PACKAGES = f"{DOMAIN}/packages"
+WS_TYPE_PACKAGE_INDEX = f"{DOMAIN}/package_index"
+
 # Attributes
 ATTR_PACKAGES = "packages"
+ATTR_PACKAGES_TRUNCATED = "packages_truncated"
+MAX_PACKAGES_IN_STATE = 20  # Övriga paket hämtas via tjänsten get_packages
 ATTR_LAST_CHECK = "last_check_success"
-ATTR_LAST_UPDATE = "last_update_success"
\ No newline at end of file
+ATTR_LAST_UPDATE = "last_update_success"
+ATTR_HOST = "host"
+ATTR_HOSTS = "hosts"
+ATTR_PACKAGE = "package"
+ATTR_CANARY = "canary"
+ATTR_CANARY_COUNT = "canary_count"
+ATTR_PARALLELISM = "parallelism"
+ATTR_REBOOT = "reboot"
+ATTR_REBOOT_TIMEOUT = "reboot_timeout"
\ No newline at end of file
@@ -1,41 +1,138 @@
-"""Version: 1.9.0 | Datum: 2025-12-19
+"""Version: 1.30.7 | Datum: 2026-10-18
 DataUpdateCoordinator for Linux Updates.
 """
+from __future__ import annotations
+
 import asyncio
 import logging
+import time
+from collections import deque
 from datetime import timedelta, datetime
-import asyncssh
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.event import async_track_time_change
 from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN,
-    CMD_CHECK_UPDATES,
-    CMD_LIST_PACKAGES,
-    CMD_UPGRADE,
+    CMD_DETECT_PACKAGE_MANAGER,
     CMD_REBOOT,
+    CONF_APT_LISTS_MAX_AGE,
+    CONF_CHECK_TIMEOUT,
     CONF_DEBUG,
+    CONF_PREFETCH_HOUR,
+    CONF_PUSH_MODE,
+    CONF_UPGRADE_TIMEOUT,
     CONF_SCAN_INTERVAL,
-    DEFAULT_SCAN_INTERVAL
+    CONF_USE_HELPER,
+    DEFAULT_APT_LISTS_MAX_AGE,
+    DEFAULT_CHECK_TIMEOUT,
+    DEFAULT_PORT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_UPGRADE_TIMEOUT,
+    LOCK_RETRY_ATTEMPTS,
+    LOCK_RETRY_DELAY,
+    EVENT_PACKAGES_CHANGED,
+    PREFETCH_MAX_AGE,
+    PREFETCH_SPREAD,
+    PUSH_SAFETY_INTERVAL,
+    RAW_OUTPUT_MAX_CHARS,
+    CMD_BOOT_ID,
+    REBOOT_GRACE_PERIOD,
+    REBOOT_RECONNECT_INITIAL,
+    REBOOT_RECONNECT_MAX,
+    REBOOT_TRACK_TIMEOUT,
+    RAW_OUTPUT_SAMPLES,
+    TIMING_SAMPLES,
+    UPGRADE_HISTORY_SIZE,
+    UPGRADE_OUTPUT_LINES,
+    UPGRADE_PROGRESS_INTERVAL,
+)
+from .backends import (
+    APT,
+    BACKENDS,
+    apt_history_command,
+    detect_backend,
+    skip_fresh_apt_update,
+)
+from .connection import (
+    SSHError,
+    async_deadline,
+    format_host_port,
+    get_connection_manager,
+)
+from .helper import (
+    HELPER_MISSING_STATUS,
+    async_install_helper,
+    helper_command,
+    parse_helper_output,
+)
+from .history import UpgradeHistory
+from .operations import MUTATING_OPERATIONS, OperationQueue
+from .package_index import get_package_index
+from .parser import (
+    PackageRecord,
+    parse_apt_history,
+    parse_download_size,
+    parse_fingerprint,
+    parse_lock_contention,
+    parse_reboot_required,
+    record_key,
+    split_history_log,
 )
+from .progress import PHASE_DONE, PHASE_WAITING_FOR_LOCK, UpgradeProgress
+from .scheduler import PollScheduler
+from .timing import (
+    HostTimings,
+    OperationTimer,
+    OPERATION_CHECK,
+    OPERATION_PREFETCH,
+    OPERATION_UPGRADE,
+    OPERATION_REBOOT,
+    PHASE_PARSE,
+    PHASE_REMOTE,
+    measure,
+)
+from .watcher import ChangeWatcher
 
 _LOGGER = logging.getLogger(__name__)
 
+
+class PackageManagerLockedError(Exception):
+    """The package manager lock stayed held by another process."""
+
+
+def _isoformat(value):
+    """Return a datetime as an ISO string for storage."""
+    return value.isoformat() if isinstance(value, datetime) else None
+
+
+def _parse_datetime(value):
+    """Return a stored ISO string as a datetime."""
+    return dt_util.parse_datetime(value) if value else None
+
+
 class LinuxUpdatesCoordinator(DataUpdateCoordinator):
     """Class to manage fetching data from the Linux server via SSH."""
 
-    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
-        """Initialize."""
+    def __init__(
+        self, hass: HomeAssistant, entry: ConfigEntry, host_config: dict | None = None
+    ) -> None:
+        """Initialize.
+
+        In fleet mode ``host_config`` holds the per-host settings. The host is
+        then polled by LinuxUpdatesFleetCoordinator and has no timer of its own.
+        """
         self.entry = entry
-        self.config = entry.data
+        self.config = {**entry.data, **host_config} if host_config else entry.data
         self.options = entry.options
+        self.fleet_member = host_config is not None
 
         scan_interval_hours = self.config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
 
@@ -43,144 +140,889 @@ class LinuxUpdatesCoordinator(DataUpdateCoordinator):
             hass,
             _LOGGER,
             name=DOMAIN,
-            update_interval=timedelta(hours=scan_interval_hours),
+            update_interval=None if self.fleet_member else timedelta(hours=scan_interval_hours),
         )
 
         self.host = self.config.get("host")
-        self.port = self.config.get("port", 22)
+        self.port = self.config.get("port", DEFAULT_PORT)
+        # Name in service responses, with the port when two hosts share an address
+        self.address = (
+            self.host if self.port == DEFAULT_PORT else format_host_port(self.host, self.port)
+        )
+
+        # Jittered, adaptive polling instead of a fixed interval (fleet hosts
+        # are polled by the fleet coordinator instead)
+        self._scheduler = PollScheduler(
+            timedelta(hours=scan_interval_hours), f"{self.host}:{self.port}"
+        )
+        if not self.fleet_member:
+            self.update_interval = self._scheduler.next_interval()
+        # Prefix for entity unique ids, one set of entities per host
+        if self.fleet_member:
+            self.unique_prefix = f"{entry.entry_id}_{self.host}_{self.port}"
+        else:
+            self.unique_prefix = entry.entry_id
         self.username = self.config.get("username")
         self.password = self.config.get("password")
         self.ssh_key = self.config.get("ssh_key_file")
 
         self.debug_mode = self.config.get(CONF_DEBUG, False)
+        self.use_helper = self.config.get(CONF_USE_HELPER, False)
+        self.apt_lists_max_age = self.config.get(CONF_APT_LISTS_MAX_AGE, DEFAULT_APT_LISTS_MAX_AGE)
+        self.check_timeout = self.config.get(CONF_CHECK_TIMEOUT, DEFAULT_CHECK_TIMEOUT)
+        self.upgrade_timeout = self.config.get(CONF_UPGRADE_TIMEOUT, DEFAULT_UPGRADE_TIMEOUT)
+        self.push_mode = self.config.get(CONF_PUSH_MODE, False)
+        self._helper_installed = False
+        # Package manager backend, detected on the first check
+        self.backend = None
+        self._fingerprint = None
+        self._force_full_check = False
+        # (inode, byte offset) read up to in apt's history.log
+        self._history_log = None
+
+        # Delad SSH-pool: en autentiserad anslutning per värd, en kanal per kommando
+        self._connections = get_connection_manager(hass)
+        self._connections.async_register(self.config, self.unique_prefix)
+
+        # Fleet-wide index shared by all hosts, package records are kept there
+        self._package_index = get_package_index(hass)
 
         # State storage
         self.update_count = 0
         self.packages = []
+        self.package_records = []
+        self.last_diff = None
+        self._package_versions = None
+        self.reboot_required = None
+        self.reboot_packages = []  # Packages listed in /var/run/reboot-required.pkgs
+        self.apt_lists_age = None
         self.last_check_success = None
-        self.last_update_success = None
-        self.command_running = False
+        # Timestamp of the last upgrade (DataUpdateCoordinator's own
+        # last_update_success is the availability flag of the entities)
+        self.last_upgrade_success = None
+        # Reboot tracking: set while waiting for the host to come back
+        self.rebooting = False
+        self.reboot_started = None
+        self.reboot_downtime = None  # Seconds the host was unreachable last time
+        self._reboot_task = None
+
+        # Checks, upgrades and reboots of this host run one at a time
+        self.operations = OperationQueue(self.async_update_listeners)
         self.error_state = False
         self.error_message = ""
+        # Set while another process holds the package manager lock
+        self.lock_holder = None
+        self.upgrade_progress = UpgradeProgress(UPGRADE_OUTPUT_LINES)
+        self._progress_pushed = 0.0
+        self._progress_pushed_phase = None
+
+        # Past upgrades, for predicting how long the next one will take
+        self.upgrade_history = UpgradeHistory(UPGRADE_HISTORY_SIZE)
+
+        # Profiling data for the diagnostic sensors and diagnostics download
+        self.timings = HostTimings(TIMING_SAMPLES)
+        self.raw_outputs = deque(maxlen=RAW_OUTPUT_SAMPLES)
+
+        # Push mode: started after the first check that finds apt
+        self.watcher = None
+
+        # Set by async_setup_entry, persists the last known state
+        self.store = None
+
+        # Packages downloaded ahead of the upgrade:
+        # {"packages": int, "bytes": int | None, "time": datetime}
+        self.prefetch = None
+        self._unsub_prefetch = None
+        if (prefetch_hour := self.config.get(CONF_PREFETCH_HOUR)) is not None:
+            self._unsub_prefetch = async_track_time_change(
+                hass, self._async_prefetch_time, hour=prefetch_hour, minute=0, second=0
+            )
 
     @property
     def device_info(self) -> DeviceInfo:
         """Return device info for the Device Registry."""
         return DeviceInfo(
-            identifiers={(DOMAIN, self.host)},
-            name=f"Linux Server ({self.host})",
+            # Fleet members are keyed per port, a single host keeps its old device
+            identifiers={(DOMAIN, self.unique_prefix if self.fleet_member else self.host)},
+            name=f"Linux Server ({self.address})",
             manufacturer="Linux",
             model="SSH Managed Server",
             sw_version="Unknown",
         )
 
+    @property
+    def host_coordinators(self) -> list[LinuxUpdatesCoordinator]:
+        """Return the per-host coordinators that entities are created for."""
+        return [self]
+
     def _log(self, level, msg, *args):
         """Internal helper to log only if debug is enabled or level is high."""
         if self.debug_mode or level >= logging.WARNING:
             _LOGGER.log(level, msg, *args)
 
+    async def async_poll(self):
+        """Run one update check on behalf of the fleet coordinator.
+
+        A host whose push channel is up reports its own changes and is only
+        checked once every PUSH_SAFETY_INTERVAL.
+        """
+        if self._push_connected() and self.last_check_success is not None and (
+            (dt_util.now() - self.last_check_success).total_seconds() < PUSH_SAFETY_INTERVAL
+        ):
+            return self.data
+        return await self._async_update_data()
+
+    @property
+    def command_running(self) -> bool:
+        """Return True while an upgrade, prefetch or reboot is queued or running."""
+        return self.operations.is_pending(MUTATING_OPERATIONS)
+
     async def _async_update_data(self):
         """Fetch data from API endpoint. This runs 'apt-get -s upgrade'."""
-        if self.command_running:
+        if self.command_running or self.rebooting:
+            # The check queued after the upgrade (or run when the host is
+            # back from its reboot) will pick up the new state
             return {
                 "count": self.update_count,
                 "packages": self.packages,
+                "reboot_required": self.reboot_required,
             }
+        # Overlapping polls and button presses share one check
+        return await self.operations.async_run(OPERATION_CHECK, self._async_check)
 
+    async def _async_check(self):
+        """Run one update check over SSH."""
+        timer = OperationTimer(OPERATION_CHECK)
         try:
             self._log(logging.INFO, "Checking for updates on %s...", self.host)
 
-            async with self._get_connection() as conn:
-                # 1. Check count (simulate upgrade - Safe Mode)
-                result_check = await conn.run(CMD_CHECK_UPDATES)
-                if result_check.exit_status != 0:
-                    raise UpdateFailed(f"APT check failed: {result_check.stderr}")
-
-                output = result_check.stdout
-                self._log(logging.DEBUG, "APT Check Output: %s", output)
-
-                count = 0
-                # Parsing logic for 'apt-get -s upgrade'
-                # Looks for: "26 upgraded, 0 newly installed..."
-                for line in output.splitlines():
-                    if "upgraded," in line and "newly installed," in line:
-                        parts = line.split()
-                        if parts[0].isdigit():
-                            count = int(parts[0])
-                            self._log(logging.DEBUG, "Parsed Safe Update Count: %s", count)
-                            break
-
-                self.update_count = count
-
-                # 2. Get Package List
-                # We fetch the list just to show what IS available, even if we don't install it all.
-                package_list = []
-                if count > 0:
-                    result_list = await conn.run(CMD_LIST_PACKAGES)
-                    lines = result_list.stdout.splitlines()
-                    for line in lines:
-                        if "/" in line and "upgradable" in line:
-                            package_list.append(line.split("/")[0])
-
-                self.packages = package_list
-                self.last_check_success = dt_util.now()
-                self.error_state = False
-                self.error_message = ""
-
-                return {
-                    "count": self.update_count,
-                    "packages": self.packages,
-                }
-
-        except (asyncssh.Error, OSError) as err:
+            # Reuse the previous result if apt lists and dpkg status are untouched
+            known = self._fingerprint
+            if self._force_full_check or self.last_check_success is None:
+                known = None
+            self._force_full_check = False
+
+            async with async_deadline(
+                self.check_timeout, f"Check timed out after {self.check_timeout} s"
+            ):
+                backend = await self._async_get_backend(timer)
+                # The helper script only speaks apt
+                if self.use_helper and backend is APT:
+                    result = await self._async_check_with_helper(known, timer)
+                else:
+                    result = await self._async_check_with_backend(backend, known, timer)
+
+            if (history := result.get("history")) is not None:
+                self._apply_history(history, result.get("unchanged"))
+            if result.get("unchanged"):
+                self._log(logging.DEBUG, "Nothing changed on %s, skipped apt simulation", self.host)
+            else:
+                self.update_count = result["count"]
+                self._set_package_records(result["packages"])
+                self._track_package_changes()
+            self._fingerprint = result.get("fingerprint")
+            self.reboot_required = result.get("reboot_required")
+            self.reboot_packages = result.get("reboot_packages", [])
+            self.apt_lists_age = result.get("lists_age")
+            self._scheduler.record_success(not result.get("unchanged"), self.apt_lists_age)
+            self._reschedule()
+            self.last_check_success = dt_util.now()
+            self.error_state = False
+            self.error_message = ""
+            # A lock that made an earlier upgrade fail is no longer a problem
+            self.lock_holder = None
+            if self.push_mode and self.watcher is None and backend is APT:
+                self._start_watcher()
+
+            return {
+                "count": self.update_count,
+                "packages": self.packages,
+                "reboot_required": self.reboot_required,
+            }
+
+        except UpdateFailed:
+            self._scheduler.record_failure()
+            self._reschedule()
+            raise
+        except (SSHError, OSError) as err:
             self.error_state = True
             self.error_message = str(err)
+            self._scheduler.record_failure()
+            self._reschedule()
             self._log(logging.ERROR, "SSH Connection error: %s", err)
             raise UpdateFailed(f"Error communicating with server: {err}")
+        except ValueError as err:
+            self._scheduler.record_failure()
+            self._reschedule()
+            self.error_state = True
+            self.error_message = f"Invalid output: {err}"
+            self._log(logging.ERROR, "Invalid output: %s", err)
+            raise UpdateFailed(f"Invalid output: {err}")
+        finally:
+            self.timings.record(timer)
+            self._schedule_save()
+
+    def stored_state(self) -> dict:
+        """Return the state saved across restarts."""
+        return {
+            "update_count": self.update_count,
+            "packages": [
+                [record.name, record.current, record.candidate, record.suite, record.arch]
+                for record in self.package_records
+            ],
+            "reboot_required": self.reboot_required,
+            "reboot_packages": self.reboot_packages,
+            "reboot_downtime": self.reboot_downtime,
+            "apt_lists_age": self.apt_lists_age,
+            "last_check_success": _isoformat(self.last_check_success),
+            "last_upgrade_success": _isoformat(self.last_upgrade_success),
+            "error_state": self.error_state,
+            "error_message": self.error_message,
+            "fingerprint": self._fingerprint,
+            "history_log": list(self._history_log) if self._history_log else None,
+            "backend": self.backend.name if self.backend else None,
+            "upgrade_history": self.upgrade_history.as_list(),
+            "prefetch": {**self.prefetch, "time": _isoformat(self.prefetch["time"])}
+            if self.prefetch else None,
+        }
+
+    def restore_state(self, state: dict) -> None:
+        """Restore the state saved by a previous run.
+
+        The fingerprint and package manager are restored too, so the first
+        check after a restart is as cheap as any other.
+        """
+        self.update_count = state.get("update_count", 0)
+        self._set_package_records([PackageRecord(*fields) for fields in state.get("packages", [])])
+        self._package_versions = {
+            record.name: record.candidate for record in self.package_records
+        }
+        self.reboot_required = state.get("reboot_required")
+        self.reboot_packages = state.get("reboot_packages", [])
+        self.reboot_downtime = state.get("reboot_downtime")
+        self.apt_lists_age = state.get("apt_lists_age")
+        self.last_check_success = _parse_datetime(state.get("last_check_success"))
+        self.last_upgrade_success = _parse_datetime(state.get("last_upgrade_success"))
+        self.error_state = state.get("error_state", False)
+        self.error_message = state.get("error_message", "")
+        self._fingerprint = state.get("fingerprint")
+        if history_log := state.get("history_log"):
+            self._history_log = tuple(history_log)
+        self.backend = BACKENDS.get(state.get("backend"))
+        self.upgrade_history.restore(state.get("upgrade_history", []))
+        if prefetch := state.get("prefetch"):
+            self.prefetch = {**prefetch, "time": _parse_datetime(prefetch["time"])}
+        self.data = {
+            "count": self.update_count,
+            "packages": self.packages,
+            "reboot_required": self.reboot_required,
+        }
+
+    def _schedule_save(self) -> None:
+        """Save the state shortly, if persistence is set up."""
+        if self.store is not None:
+            self.store.async_schedule_save()
+
+    def _reschedule(self) -> None:
+        """Pick the delay until the next poll from the adaptive scheduler.
+
+        While the push channel is up polling is only a safety net.
+        """
+        if self.fleet_member:
+            return
+        if self._push_connected():
+            self.update_interval = timedelta(seconds=PUSH_SAFETY_INTERVAL)
+        else:
+            self.update_interval = self._scheduler.next_interval()
+        self._log(logging.DEBUG, "Next check of %s in %s", self.host, self.update_interval)
+
+    def _push_connected(self) -> bool:
+        """Return True while the push channel reports changes of this host."""
+        return self.watcher is not None and self.watcher.connected
+
+    def _start_watcher(self) -> None:
+        """Open the push channel."""
+        self._log(logging.INFO, "Starting push mode for %s", self.host)
+        self.watcher = ChangeWatcher(
+            self.hass, self._connections, self.config, self.async_refresh, self._async_push_state
+        )
+        self.watcher.start()
+
+    @callback
+    def _async_push_state(self) -> None:
+        """Switch between push and polling when the channel comes up or drops."""
+        self._log(
+            logging.INFO, "Push channel to %s %s", self.host,
+            "up" if self._push_connected() else "down, polling instead",
+        )
+        self._reschedule()
+        # The pending timer was set for the other mode
+        if not self.fleet_member and self._listeners:
+            self._schedule_refresh()
+        self.async_update_listeners()
+
+    async def async_force_check(self) -> None:
+        """Run a full check now, even if the host fingerprint is unchanged."""
+        self._force_full_check = True
+        await self.async_request_refresh()
+
+    def _set_package_records(self, records) -> None:
+        """Store the pending packages, as the shared copies from the package index."""
+        self.package_records = self._package_index.update(self.unique_prefix, self.address, records)
+        self.packages = [record.name for record in self.package_records]
+
+    def _track_package_changes(self) -> None:
+        """Compare the package set with the previous check and fire a compact diff event.
+
+        Only names and versions that changed are sent, so automations can react
+        without the full list ever being written to the recorder.
+        """
+        versions = {record.name: record.candidate for record in self.package_records}
+        previous = self._package_versions
+        self._package_versions = versions
+        if previous is None:
+            return
+
+        added = {name: versions[name] for name in versions.keys() - previous.keys()}
+        removed = sorted(previous.keys() - versions.keys())
+        changed = {
+            name: {"from": previous[name], "to": version}
+            for name, version in versions.items()
+            if name in previous and previous[name] != version
+        }
+        if not (added or removed or changed):
+            return
+
+        self.last_diff = {"added": added, "removed": removed, "changed": changed}
+        self._log(
+            logging.DEBUG, "Package changes on %s: %s added, %s removed, %s changed",
+            self.host, len(added), len(removed), len(changed),
+        )
+        self.hass.bus.async_fire(
+            EVENT_PACKAGES_CHANGED,
+            {"host": self.host, "entry_id": self.entry.entry_id, **self.last_diff},
+        )
+
+    async def _async_get_backend(self, timer=None):
+        """Return the host's package manager backend, detecting it once."""
+        if self.backend is None:
+            result = await self._run(CMD_DETECT_PACKAGE_MANAGER, timer)
+            backend = detect_backend(result.stdout or "")
+            if backend is None:
+                raise UpdateFailed(f"No supported package manager found on {self.host}")
+            self._log(logging.INFO, "Using %s on %s", backend.name, self.host)
+            self.backend = backend
+        return self.backend
+
+    async def _async_check_with_backend(self, backend, known_fingerprint, timer=None):
+        """Check for updates with the package manager's cache-only query.
+
+        For apt this is 'apt-get -s upgrade', whose Inst lines carry name,
+        versions, suite and arch, so no separate 'apt list --upgradable' round
+        trip is needed. A cheap stat call runs first and the query is skipped
+        if its fingerprint equals ``known_fingerprint``.
+        """
+        command = backend.fingerprint_command
+        if backend is APT:
+            command = self._with_history_log(command)
+        # Raw bytes, see _split_history
+        result_fp = await self._run(command, timer, encoding=None)
+        with measure(timer, PHASE_PARSE):
+            output, history = self._split_history(result_fp.stdout)
+            fingerprint, lists_age = parse_fingerprint(output)
+            reboot_required, reboot_packages = parse_reboot_required(output)
+        state = {
+            "fingerprint": fingerprint,
+            "lists_age": lists_age,
+            "reboot_required": reboot_required,
+            "reboot_packages": reboot_packages,
+            "history": history,
+        }
+        if fingerprint == known_fingerprint:
+            return {**state, "unchanged": True}
+        if (
+            history is not None and history[2] and known_fingerprint
+            and fingerprint.split()[0] == known_fingerprint.split()[0]
+            and self._history_explains(history[2])
+        ):
+            # Only dpkg's status changed and history.log says how, the
+            # transactions are replayed on the cached list instead
+            return {**state, "unchanged": True}
+
+        # Simulate upgrade - Safe Mode
+        result_check = await self._run(backend.check_command, timer)
+        if not backend.check_succeeded(result_check.exit_status, result_check.stderr):
+            raise UpdateFailed(f"{backend.name} check failed: {result_check.stderr}")
+
+        output = result_check.stdout
+        self._log(logging.DEBUG, "%s Check Output: %s", backend.name, output)
+
+        with measure(timer, PHASE_PARSE):
+            count, records = backend.parse(output)
+        self._log(logging.DEBUG, "Parsed Safe Update Count: %s", count)
 
-    def _get_connection(self):
-        """Helper to establish SSH connection."""
-        client_keys = [self.ssh_key] if self.ssh_key else None
-        return asyncssh.connect(
-            self.host,
-            port=self.port,
-            username=self.username,
-            password=self.password,
-            client_keys=client_keys,
-            known_hosts=None,
+        return {**state, "count": count, "packages": records}
+
+    async def _async_check_with_helper(self, known_fingerprint, timer=None):
+        """Check for updates with the cached remote helper in one exec."""
+        if not self._helper_installed:
+            await self._async_install_helper(timer)
+            self._helper_installed = True
+
+        command = self._with_history_log(helper_command(known_fingerprint))
+        result = await self._run(command, timer, encoding=None)
+        if result.exit_status == HELPER_MISSING_STATUS:
+            # The helper was removed on the host (e.g. home directory wiped)
+            self._log(logging.INFO, "Helper missing on %s, reinstalling", self.host)
+            await self._async_install_helper(timer)
+            result = await self._run(command, timer, encoding=None)
+
+        with measure(timer, PHASE_PARSE):
+            output, history = self._split_history(result.stdout)
+        self._log(logging.DEBUG, "Helper Output: %s", output)
+        if result.exit_status != 0:
+            stderr = (result.stderr or b"").decode(errors="replace")
+            raise UpdateFailed(f"Helper check failed: {output or stderr}")
+
+        with measure(timer, PHASE_PARSE):
+            return {**parse_helper_output(output), "history": history}
+
+    def _with_history_log(self, command: str) -> str:
+        """Append the new part of apt's history.log to a command, keeping its exit status."""
+        return f"{command}; s=$?; {apt_history_command(self._history_log)}; exit $s"
+
+    @staticmethod
+    def _split_history(output: bytes):
+        """Split a command output from its history.log part and parse that.
+
+        Commands carrying the log are run with encoding=None: the size limit
+        can cut a UTF-8 character, which a strict decode on the channel would
+        fail on at every poll from then on.
+        """
+        output, history = split_history_log(output or b"")
+        return output, parse_apt_history(history) if history is not None else None
+
+    def _history_explains(self, transactions) -> bool:
+        """Return True if the transactions only upgraded or removed pending packages.
+
+        Only then does replaying them on the cached list give the same result
+        as a new simulation. A newly installed package may pull in or hold
+        back others and is left to the simulation.
+        """
+        pending = {record_key(record) for record in self.package_records}
+        return all(
+            transaction.installed.keys() <= pending and transaction.removed <= pending
+            for transaction in transactions
         )
 
-    async def trigger_update(self):
-        """Triggers the apt-get upgrade command."""
-        if self.command_running:
+    def _apply_history(self, history, replay: bool) -> None:
+        """Take note of the transactions apt logged since the last check.
+
+        Upgrades done outside Home Assistant (unattended-upgrades, by hand)
+        move the last upgrade time. With ``replay`` the package list was not
+        simulated again and the installed and removed packages are dropped
+        from it here, a package still behind its candidate stays pending.
+        """
+        inode, offset, transactions = history
+        self._history_log = (inode, offset)
+        upgraded = [transaction.end for transaction in transactions if transaction.upgrades]
+        if upgraded and (self.last_upgrade_success is None or max(upgraded) > self.last_upgrade_success):
+            self.last_upgrade_success = max(upgraded)
+            self._log(logging.INFO, "Upgrade on %s found in apt's history.log", self.host)
+        if not (replay and transactions):
+            return
+
+        installed = {}
+        for transaction in transactions:
+            for key in transaction.removed:
+                installed[key] = None
+            installed.update(transaction.installed)
+        records = []
+        for record in self.package_records:
+            key = record_key(record)
+            if key not in installed:
+                records.append(record)
+            elif (version := installed[key]) is not None and version != record.candidate:
+                records.append(PackageRecord(record.name, version, record.candidate, record.suite, record.arch))
+        if len(records) == len(self.package_records):
             return
+        self.update_count = max(0, self.update_count - (len(self.package_records) - len(records)))
+        self._set_package_records(records)
+        self._track_package_changes()
+
+    async def _async_install_helper(self, timer=None):
+        """Upload the helper script over SFTP."""
+        async with self._get_connection(timer) as conn:
+            with measure(timer, PHASE_REMOTE):
+                await async_install_helper(conn)
+
+    def _get_connection(self, timer=None):
+        """Borrow the pooled SSH connection for this host."""
+        return self._connections.async_connection(self.config, timer)
+
+    async def _run(self, command, timer=None, **kwargs):
+        """Run a command on a fresh channel of the pooled connection."""
+        result = await self._connections.async_run(self.config, command, timer, **kwargs)
+        self._record_output(command, result.exit_status, result.stdout)
+        return result
+
+    def _record_output(self, command, exit_status, output):
+        """Keep the last few raw command outputs for the diagnostics download."""
+        output = output or ""
+        if isinstance(output, bytes):
+            output = output.decode(errors="replace")
+        self.raw_outputs.append({
+            "time": dt_util.now().isoformat(),
+            "command": command,
+            "exit_status": exit_status,
+            "output": output[-RAW_OUTPUT_MAX_CHARS:],
+            "truncated": len(output) > RAW_OUTPUT_MAX_CHARS,
+        })
+
+    async def async_shutdown(self) -> None:
+        """Release the pooled connection when the entry is unloaded."""
+        if self._unsub_prefetch is not None:
+            self._unsub_prefetch()
+            self._unsub_prefetch = None
+        self.operations.cancel()
+        if self._reboot_task is not None and not self._reboot_task.done():
+            self._reboot_task.cancel()
+        if self.watcher is not None:
+            await self.watcher.async_stop()
+        self._package_index.remove(self.unique_prefix)
+        await super().async_shutdown()
+        await self._connections.async_release(self.config, self.unique_prefix)
+
+    async def trigger_update(self) -> bool:
+        """Triggers the upgrade command of the host's package manager.
 
-        self.command_running = True
+        Returns True if the upgrade ran and succeeded. Pressing again while
+        it is queued or running waits for the same run.
+        """
+        if not await self.operations.async_run(OPERATION_UPGRADE, self._async_upgrade):
+            return False
+        # Only now, with the upgrade out of the queue, does the check reach the host
+        await self.async_refresh()
+        return True
+
+    async def _async_upgrade(self) -> bool:
+        """Run the upgrade, streaming its progress to the entities."""
         self._log(logging.INFO, "Starting system update...")
 
+        progress = self.upgrade_progress
+        progress.start()
+        self.async_update_listeners()
+        timer = OperationTimer(OPERATION_UPGRADE)
+        exit_status = None
+        command = None
+        pending = self.update_count
+        download = {"bytes": None}
+
+        def on_line(line):
+            with measure(timer, PHASE_PARSE):
+                changed = progress.feed(line)
+                if (size := parse_download_size(line)) is not None:
+                    download["bytes"] = size
+            if changed:
+                self._push_progress()
+
         try:
-            async with self._get_connection() as conn:
-                # Runs the safe upgrade command
-                result = await conn.run(CMD_UPGRADE, check=True)
-                self._log(logging.INFO, "Update completed. Output: %s", result.stdout)
-                self.last_update_success = dt_util.now()
-                self.error_state = False
+            backend = await self._async_get_backend(timer)
+            command = backend.upgrade_command
+            if self._prefetch_usable():
+                # Everything is downloaded already, only unpack and configure
+                command = backend.upgrade_prefetched_command
+            command = skip_fresh_apt_update(command, self.apt_lists_max_age)
+            # Runs the safe upgrade command, streaming its output line by line
+            # so that only a bounded tail is kept in memory.
+            exit_status = await self._async_stream_locked(command, timer, on_line, progress)
+            if exit_status != 0:
+                raise SSHError(f"'{command}' exited with status {exit_status}")
 
-                # Refresh data immediately
-                await self.async_request_refresh()
+            progress.finish(True)
+            self._log(
+                logging.INFO, "Update completed. Last output:\n%s", "\n".join(progress.output)
+            )
+            self.last_upgrade_success = dt_util.now()
+            self.error_state = False
+            self.prefetch = None
+            self.async_update_listeners()
+            return True
 
         except Exception as e:
             self._log(logging.ERROR, "Update failed: %s", e)
             self.error_state = True
             self.error_message = f"Update failed: {str(e)}"
+            progress.finish(False)
+            self.async_update_listeners()
+            return False
         finally:
-            self.command_running = False
+            self.timings.record(timer)
+            self._record_output(command, exit_status, "\n".join(progress.output))
+            self._record_upgrade(timer, progress.total or pending, download["bytes"])
+            self._schedule_save()
+
+    def _record_upgrade(self, timer, packages, size) -> None:
+        """Add the finished upgrade to the duration history."""
+        phases = {**timer.phases, **self.upgrade_progress.durations}
+        self.upgrade_history.add({
+            "time": dt_util.now().isoformat(),
+            "success": self.upgrade_progress.phase == PHASE_DONE,
+            "packages": packages,
+            "bytes": size,
+            "duration": round(timer.elapsed(), 1),
+            "phases": {phase: round(seconds, 2) for phase, seconds in phases.items()},
+        })
+
+    @property
+    def predicted_upgrade_duration(self) -> float | None:
+        """Return the expected seconds to upgrade the pending packages."""
+        if not self.update_count:
+            return 0.0
+        return self.upgrade_history.predict(self.update_count)
+
+    async def _async_stream(self, command, timer, on_line) -> int:
+        """Run a command, handing every output line to ``on_line``.
+
+        Returns the exit status.
+        """
+        async with self._connections.async_process(self.config, command, timer) as process:
+            async for line in process.stdout:
+                on_line(line)
+            completed = await process.wait()
+        return completed.exit_status
+
+    async def _async_stream_locked(self, command, timer, on_line, progress=None) -> int:
+        """Stream a command that needs the package manager lock.
+
+        If another process (typically unattended-upgrades) holds the lock the
+        command is run again after a short pause, a few times, instead of
+        failing until the next poll. The whole run is limited to the upgrade
+        timeout and the remote command is stopped when it runs out.
+        """
+        async with async_deadline(
+            self.upgrade_timeout, f"Timed out after {self.upgrade_timeout} s"
+        ):
+            for attempt in range(1, LOCK_RETRY_ATTEMPTS + 1):
+                holder = None
+
+                def feed(line):
+                    nonlocal holder
+                    holder = parse_lock_contention(line) or holder
+                    on_line(line)
+
+                exit_status = await self._async_stream(command, timer, feed)
+                self.lock_holder = holder if exit_status != 0 else None
+                if self.lock_holder is None:
+                    return exit_status
+                if attempt == LOCK_RETRY_ATTEMPTS:
+                    raise PackageManagerLockedError(f"Package manager locked by {holder}")
+
+                self._log(
+                    logging.WARNING, "Package manager on %s locked by %s, retrying in %s s",
+                    self.host, holder, LOCK_RETRY_DELAY,
+                )
+                if progress is not None:
+                    progress.phase = PHASE_WAITING_FOR_LOCK
+                self.async_update_listeners()
+                await asyncio.sleep(LOCK_RETRY_DELAY)
+                if progress is not None:
+                    progress.start()
+
+    def _prefetch_usable(self) -> bool:
+        """Return True if a recent prefetch left the packages in the cache."""
+        if not self.prefetch or self.prefetch["time"] is None:
+            return False
+        age = (dt_util.now() - self.prefetch["time"]).total_seconds()
+        return age < PREFETCH_MAX_AGE
+
+    @property
+    def supports_prefetch(self) -> bool:
+        """Return False once the host is known to use a backend without prefetch."""
+        return self.backend is None or self.backend.prefetch_command is not None
+
+    async def trigger_prefetch(self) -> bool:
+        """Download the pending packages now so the upgrade only has to install them.
 
-    async def trigger_reboot(self):
-        """Triggers the reboot command."""
+        Returns True if the download succeeded.
+        """
+        return await self.operations.async_run(OPERATION_PREFETCH, self._async_prefetch)
+
+    async def _async_prefetch(self) -> bool:
+        """Download the pending packages without installing them."""
+        self._log(logging.INFO, "Prefetching packages on %s...", self.host)
+        timer = OperationTimer(OPERATION_PREFETCH)
+        output = deque(maxlen=UPGRADE_OUTPUT_LINES)
+        found = {"bytes": None}
+        exit_status = None
+        command = None
+
+        def on_line(line):
+            line = line.rstrip("\n")
+            output.append(line)
+            with measure(timer, PHASE_PARSE):
+                if (size := parse_download_size(line)) is not None:
+                    found["bytes"] = size
+
+        try:
+            backend = await self._async_get_backend(timer)
+            if not (command := backend.prefetch_command):
+                raise UpdateFailed(f"{backend.name} does not support prefetching")
+            command = skip_fresh_apt_update(command, self.apt_lists_max_age)
+            exit_status = await self._async_stream_locked(command, timer, on_line)
+            if exit_status != 0:
+                raise SSHError(f"'{command}' exited with status {exit_status}")
+
+            self.error_state = False
+            self.error_message = ""
+            self.prefetch = {
+                "packages": self.update_count,
+                "bytes": found["bytes"],
+                "time": dt_util.now(),
+            }
+            self._log(
+                logging.INFO, "Prefetched %s packages (%s bytes) on %s",
+                self.prefetch["packages"], self.prefetch["bytes"], self.host,
+            )
+            return True
+
+        except Exception as e:
+            self._log(logging.ERROR, "Prefetch failed: %s", e)
+            self.error_state = True
+            self.error_message = f"Prefetch failed: {str(e)}"
+            return False
+        finally:
+            self.timings.record(timer)
+            self._record_output(command, exit_status, "\n".join(output))
+            self._schedule_save()
+            self.async_update_listeners()
+
+    @callback
+    def _async_prefetch_time(self, _now=None) -> None:
+        """Start the daily prefetch, spread out so a fleet doesn't start at once."""
+        self.hass.async_create_background_task(
+            self._async_scheduled_prefetch(), f"{DOMAIN} prefetch {self.host}"
+        )
+
+    async def _async_scheduled_prefetch(self) -> None:
+        """Prefetch after this host's fixed delay, if there is anything to fetch."""
+        if self.backend is None or not self.supports_prefetch:
+            # Not checked yet, or a package manager that can't download ahead (apk)
+            return
+        await asyncio.sleep(self._scheduler.offset * PREFETCH_SPREAD)
+        if self.update_count and not self._prefetch_usable():
+            await self.trigger_prefetch()
+
+    def _push_progress(self) -> None:
+        """Let the progress entities update.
+
+        Phase changes are pushed right away, percentage changes at most every
+        few seconds so a large upgrade doesn't flood the state machine.
+        """
+        now = time.monotonic()
+        if (
+            self.upgrade_progress.phase != self._progress_pushed_phase
+            or now - self._progress_pushed >= UPGRADE_PROGRESS_INTERVAL
+        ):
+            self._progress_pushed = now
+            self._progress_pushed_phase = self.upgrade_progress.phase
+            self.async_update_listeners()
+
+    async def trigger_reboot(self) -> bool:
+        """Triggers the reboot command, after anything already queued.
+
+        The host is then tracked until it accepts SSH again. Returns False if
+        the host refused to reboot.
+        """
+        return await self.operations.async_run(OPERATION_REBOOT, self._async_reboot)
+
+    async def _async_reboot(self) -> bool:
+        """Send the reboot command and start tracking the host."""
         self._log(logging.INFO, "Triggering reboot...")
+        timer = OperationTimer(OPERATION_REBOOT)
+        boot_id = None
+        result = None
         try:
-            async with self._get_connection() as conn:
-                await conn.run(CMD_REBOOT)
+            boot_id = (await self._run(CMD_BOOT_ID, timer)).stdout.strip() or None
+            result = await self._run(CMD_REBOOT, timer)
         except Exception as e:
-            self._log(logging.INFO, "Reboot command sent (connection drop expected): %s", e)
\ No newline at end of file
+            self._log(logging.INFO, "Reboot command sent (connection drop expected): %s", e)
+        finally:
+            # The host is going down, never hand out this connection again
+            self._connections.invalidate(self.config)
+            self.timings.record(timer)
+
+        if result is not None and result.exit_status:
+            # Refused (e.g. no sudo rights), the host stays up: don't track it
+            error = (result.stderr or "").strip() or f"exited with status {result.exit_status}"
+            self._log(logging.ERROR, "Reboot failed: %s", error)
+            self.error_state = True
+            self.error_message = f"Reboot failed: {error}"
+            self.async_update_listeners()
+            return False
+
+        self.rebooting = True
+        self.reboot_started = dt_util.now()
+        self.async_update_listeners()
+        self._reboot_task = self.hass.async_create_background_task(
+            self._async_track_reboot(boot_id), f"{DOMAIN} reboot {self.host}"
+        )
+        return True
+
+    async def _async_track_reboot(self, boot_id) -> bool:
+        """Poll until the host is back, then refresh right away.
+
+        Attempts start after a few seconds and back off exponentially. With
+        the boot id from before the reboot a host that has not gone down yet
+        is told apart from one that is back, so polling can start early.
+        Returns False if the host did not come back in time.
+        """
+        start = time.monotonic()
+        delay = REBOOT_RECONNECT_INITIAL
+        if boot_id is None:
+            await asyncio.sleep(REBOOT_GRACE_PERIOD)
+        try:
+            while time.monotonic() - start < REBOOT_TRACK_TIMEOUT:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, REBOOT_RECONNECT_MAX)
+                try:
+                    result = await self._run(CMD_BOOT_ID)
+                except (SSHError, OSError) as err:
+                    self._log(logging.DEBUG, "%s not back yet: %s", self.host, err)
+                    continue
+                if boot_id is not None and result.stdout.strip() == boot_id:
+                    # Still up, the reboot hasn't taken it down yet. Keep backing
+                    # off so a host that never goes down isn't hammered for 30 min
+                    self._connections.invalidate(self.config)
+                    continue
+
+                self.reboot_downtime = round(time.monotonic() - start, 1)
+                self._log(logging.INFO, "%s back after %s s", self.host, self.reboot_downtime)
+                self.rebooting = False
+                self._force_full_check = True
+                await self.async_refresh()
+                return True
+
+            self._log(logging.WARNING, "%s not back %s s after reboot", self.host, REBOOT_TRACK_TIMEOUT)
+            return False
+        finally:
+            self.rebooting = False
+            self.async_update_listeners()
+
+    async def async_verify(self) -> bool:
+        """Run a full check right now and return True if it succeeded."""
+        self._force_full_check = True
+        await self.async_refresh()
+        return self.last_update_success and not self.error_state
+
+    async def async_wait_until_online(self, timeout: float) -> bool:
+        """Wait for the host to accept SSH again after a reboot.
+
+        Returns False if it did not come back within ``timeout`` seconds.
+        """
+        if self._reboot_task is None:
+            return True
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._reboot_task), timeout)
+        except asyncio.TimeoutError:
+            return False
@@ -0,0 +1,69 @@
+"""Version: 1.9.0 | Datum: 2026-10-18
+Diagnostics download for Linux Updates.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .connection import get_connection_manager
+from .const import DOMAIN, CONF_PASSWORD
+from .package_index import get_package_index
+
+TO_REDACT = {CONF_PASSWORD}
+
+
+def _host_diagnostics(coordinator) -> dict[str, Any]:
+    """Return the state, timings and last raw outputs of one host."""
+    return {
+        "host": coordinator.host,
+        "port": coordinator.port,
+        "package_manager": coordinator.backend.name if coordinator.backend else None,
+        "use_helper": coordinator.use_helper,
+        "update_count": coordinator.update_count,
+        "reboot_required": coordinator.reboot_required,
+        "reboot_packages": coordinator.reboot_packages,
+        "rebooting": coordinator.rebooting,
+        "reboot_downtime": coordinator.reboot_downtime,
+        "apt_lists_age": coordinator.apt_lists_age,
+        "fingerprint": coordinator._fingerprint,
+        "history_log": coordinator._history_log,
+        "update_interval": str(coordinator.update_interval),
+        "push": coordinator.watcher.as_dict() if coordinator.watcher else None,
+        "last_check_success": coordinator.last_check_success,
+        "last_upgrade_success": coordinator.last_upgrade_success,
+        "current_operation": coordinator.operations.current,
+        "queued_operations": coordinator.operations.queued,
+        "error_state": coordinator.error_state,
+        "error_message": coordinator.error_message,
+        "lock_holder": coordinator.lock_holder,
+        "check_timeout": coordinator.check_timeout,
+        "upgrade_timeout": coordinator.upgrade_timeout,
+        "upgrade_phase": coordinator.upgrade_progress.phase,
+        "prefetch": coordinator.prefetch,
+        "predicted_upgrade_duration": coordinator.predicted_upgrade_duration,
+        "upgrade_history": coordinator.upgrade_history.as_list(),
+        "timings": coordinator.timings.as_dict(),
+        "last_run": coordinator.timings.last_run,
+        "raw_outputs": list(coordinator.raw_outputs),
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    connections = get_connection_manager(hass)
+    return {
+        "entry": {
+            "data": async_redact_data(dict(entry.data), TO_REDACT),
+            "options": async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        "ssh_handshakes": connections.handshakes,
+        "package_index": get_package_index(hass).stats(),
+        "hosts": [_host_diagnostics(host) for host in coordinator.host_coordinators],
+    }
@@ -0,0 +1,165 @@
+"""Version: 1.0.2 | Datum: 2026-10-18
+Fleet mode for Linux Updates: one config entry polling many hosts.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import (
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+
+from .const import (
+    DOMAIN,
+    CONF_HOST,
+    CONF_PORT,
+    CONF_USERNAME,
+    CONF_SCAN_INTERVAL,
+    CONF_FLEET_HOSTS,
+    CONF_INVENTORY_FILE,
+    CONF_FLEET_CONCURRENCY,
+    DEFAULT_PORT,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_FLEET_CONCURRENCY,
+)
+from .connection import split_host_port
+from .coordinator import LinuxUpdatesCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def is_fleet_config(data) -> bool:
+    """Return True if a config entry describes a fleet of hosts."""
+    return bool(data.get(CONF_FLEET_HOSTS) or data.get(CONF_INVENTORY_FILE))
+
+
+def parse_hosts(text: str) -> list[dict]:
+    """Parse a host list into per-host settings.
+
+    Hosts are separated by newlines, commas or spaces and written as
+    ``[user@]host[:port]``, with IPv6 addresses bare or as ``[address]:port``.
+    Everything after a ``#`` is a comment.
+    """
+    hosts = []
+    for line in text.splitlines():
+        line = line.split("#", 1)[0]
+        for item in line.replace(",", " ").split():
+            host_config = {}
+            if "@" in item:
+                host_config[CONF_USERNAME], item = item.rsplit("@", 1)
+            host, port = split_host_port(item)
+            if port is not None:
+                host_config[CONF_PORT] = port
+            host_config[CONF_HOST] = host
+            hosts.append(host_config)
+    return hosts
+
+
+def load_hosts(hass: HomeAssistant, data) -> list[dict]:
+    """Collect hosts from the config and the inventory file.
+
+    A host listed twice, in either source and with or without the default
+    port, is kept once: the first entry wins. Reads from disk, run in the
+    executor.
+    """
+    hosts = parse_hosts(data.get(CONF_FLEET_HOSTS) or "")
+    if inventory := data.get(CONF_INVENTORY_FILE):
+        path = inventory if os.path.isabs(inventory) else hass.config.path(inventory)
+        with open(path, encoding="utf-8") as inventory_file:
+            hosts.extend(parse_hosts(inventory_file.read()))
+
+    unique = {}
+    for host_config in hosts:
+        port = host_config.get(CONF_PORT, data.get(CONF_PORT, DEFAULT_PORT))
+        unique.setdefault((host_config[CONF_HOST], port), host_config)
+    return list(unique.values())
+
+
+class LinuxUpdatesFleetCoordinator(DataUpdateCoordinator):
+    """Poll many hosts on one timer with a bounded number of concurrent checks.
+
+    Every host has its own LinuxUpdatesCoordinator (and device) without a timer
+    of its own. Once per cycle the fleet polls all of them concurrently, limited
+    by a semaphore, and hands each host its result.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize."""
+        self.entry = entry
+        self.config = entry.data
+        self.concurrency = max(1, self.config.get(CONF_FLEET_CONCURRENCY, DEFAULT_FLEET_CONCURRENCY))
+
+        scan_interval_hours = self.config.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{DOMAIN}_fleet",
+            update_interval=timedelta(hours=scan_interval_hours),
+        )
+
+        self.coordinators: list[LinuxUpdatesCoordinator] = []
+
+    @property
+    def host_coordinators(self) -> list[LinuxUpdatesCoordinator]:
+        """Return the per-host coordinators that entities are created for."""
+        return self.coordinators
+
+    async def async_setup_hosts(self) -> None:
+        """Create one coordinator per host in the fleet."""
+        hosts = await self.hass.async_add_executor_job(load_hosts, self.hass, self.config)
+        self.coordinators = [
+            LinuxUpdatesCoordinator(self.hass, self.entry, host_config)
+            for host_config in hosts
+        ]
+        _LOGGER.debug("Fleet %s has %s hosts", self.entry.title, len(self.coordinators))
+
+        # Entities listen to the host coordinators, so keep a listener on the
+        # fleet itself or its timer would never be scheduled.
+        self.entry.async_on_unload(self.async_add_listener(self._async_cycle_done))
+
+    @callback
+    def _async_cycle_done(self) -> None:
+        """Listener that keeps the fleet timer running."""
+
+    async def _async_update_data(self):
+        """Poll every host, at most ``concurrency`` at a time."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def poll(coordinator: LinuxUpdatesCoordinator):
+            async with semaphore:
+                try:
+                    return await coordinator.async_poll(), None
+                except UpdateFailed as err:
+                    return None, err
+                except Exception as err:  # pylint: disable=broad-except
+                    # One broken host must never stop the rest of the fleet
+                    _LOGGER.exception("Unexpected error checking %s", coordinator.host)
+                    return None, UpdateFailed(str(err))
+
+        results = await asyncio.gather(*(poll(coordinator) for coordinator in self.coordinators))
+
+        snapshot = {}
+        for coordinator, (data, err) in zip(self.coordinators, results):
+            if err is not None:
+                coordinator.async_set_update_error(err)
+            else:
+                coordinator.async_set_updated_data(data)
+            snapshot[coordinator.unique_prefix] = data
+
+        if self.coordinators and all(err is not None for _, err in results):
+            raise UpdateFailed("No host in the fleet could be checked")
+
+        return snapshot
+
+    async def async_shutdown(self) -> None:
+        """Shut down the fleet and every host in it."""
+        await super().async_shutdown()
+        for coordinator in self.coordinators:
+            await coordinator.async_shutdown()
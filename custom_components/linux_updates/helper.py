@@ -0,0 +1,121 @@
+"""Version: 1.4.1 | Datum: 2026-10-18
+Remote helper script for Linux Updates.
+
+The helper is uploaded once per host over SFTP and answers a whole update
+check in a single exec with one compact JSON document.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import shlex
+from typing import TYPE_CHECKING, Any
+
+from .parser import PackageRecord
+
+if TYPE_CHECKING:
+    import asyncssh
+
+_LOGGER = logging.getLogger(__name__)
+
+HELPER_DIR = ".cache/linux_updates"
+
+# Usage: helper.sh [known fingerprint]
+# Output: {"v":1,"fp":"...","reboot_required":bool,"reboot_packages":[...],
+#          "lists_age":seconds,"count":N,"packages":[[name,current,candidate,suite,arch],...]}
+# If the fingerprint matches the argument the simulation is skipped and
+# "unchanged":true is sent instead of count and packages.
+HELPER_SCRIPT = r"""#!/bin/sh
+# Linux Updates helper - managed by Home Assistant, do not edit.
+export LANG=C LC_ALL=C
+now=$(date +%s)
+fp=$(echo $(stat -c %Y:%s /var/lib/apt/lists /var/lib/dpkg/status 2>/dev/null))
+lists=${fp%%:*}
+reboot=false
+rpkgs=""
+if [ -f /var/run/reboot-required ]; then
+    reboot=true
+    rpkgs=$(awk '!seen[$0]++ { printf "%s\"%s\"", sep, $0; sep = "," }' /var/run/reboot-required.pkgs 2>/dev/null)
+fi
+head="\"v\":1,\"fp\":\"$fp\",\"reboot_required\":$reboot,\"reboot_packages\":[$rpkgs],\"lists_age\":$((now - ${lists:-$now}))"
+if [ -n "$fp" ] && [ "$fp" = "$1" ]; then
+    echo "{$head,\"unchanged\":true}"
+    exit 0
+fi
+sim=$(/usr/bin/apt-get -s -o Debug::NoLocking=true upgrade 2>&1) || {
+    echo '{"v":1,"error":"apt-get simulate failed"}'
+    exit 1
+}
+printf '%s\n' "$sim" | awk -v head="$head" '
+/^Inst / {
+    cur = ""; i = 3
+    if ($3 ~ /^\[/) { cur = substr($3, 2, length($3) - 2); i = 4 }
+    cand = substr($i, 2); suite = $(i + 1); sub(/,$/, "", suite); arch = ""
+    for (j = i + 1; j <= NF; j++) if ($j ~ /^\[.*\]\)$/) { arch = substr($j, 2, length($j) - 3); break }
+    pk = pk sep "[\"" $2 "\",\"" cur "\",\"" cand "\",\"" suite "\",\"" arch "\"]"; sep = ","
+}
+/ upgraded, .* newly installed,/ { count = $1 }
+END {
+    printf "{%s,\"count\":%d,\"packages\":[%s]}\n", head, count, pk
+}'
+"""
+
+HELPER_VERSION = hashlib.sha256(HELPER_SCRIPT.encode()).hexdigest()[:12]
+HELPER_PATH = f"{HELPER_DIR}/helper-{HELPER_VERSION}.sh"
+# Exit status when the script file is missing. Checked by the command itself,
+# as /bin/sh reports a missing script with 127 in bash but 2 in dash.
+HELPER_MISSING_STATUS = 127
+CMD_HELPER = f"[ -f {HELPER_PATH} ] || exit {HELPER_MISSING_STATUS}; /bin/sh {HELPER_PATH}"
+
+
+async def async_install_helper(conn: asyncssh.SSHClientConnection) -> None:
+    """Upload the current helper version unless the host already has it.
+
+    Older helper versions left behind by previous releases are removed.
+    """
+    async with conn.start_sftp_client() as sftp:
+        if await sftp.exists(HELPER_PATH):
+            return
+
+        await sftp.makedirs(HELPER_DIR, exist_ok=True)
+        tmp_path = f"{HELPER_PATH}.tmp"
+        async with sftp.open(tmp_path, "w") as remote_file:
+            await remote_file.write(HELPER_SCRIPT)
+        await sftp.chmod(tmp_path, 0o700)
+        await sftp.rename(tmp_path, HELPER_PATH)
+
+        for name in await sftp.listdir(HELPER_DIR):
+            if name.startswith("helper-") and f"{HELPER_DIR}/{name}" != HELPER_PATH:
+                await sftp.remove(f"{HELPER_DIR}/{name}")
+
+    _LOGGER.debug("Installed helper %s", HELPER_VERSION)
+
+
+def helper_command(fingerprint: str | None) -> str:
+    """Return the command running the helper, skipping apt if nothing changed."""
+    if not fingerprint:
+        return CMD_HELPER
+    return f"{CMD_HELPER} {shlex.quote(fingerprint)}"
+
+
+def parse_helper_output(output: str) -> dict[str, Any]:
+    """Decode the helper's JSON document into coordinator data."""
+    doc = json.loads(output)
+    if "error" in doc:
+        raise ValueError(doc["error"])
+
+    result = {
+        "fingerprint": doc["fp"],
+        "reboot_required": doc["reboot_required"],
+        "reboot_packages": doc.get("reboot_packages", []),
+        "lists_age": doc["lists_age"],
+    }
+    if doc.get("unchanged"):
+        return {**result, "unchanged": True}
+
+    records = [
+        PackageRecord(name, current or None, candidate, suite, arch)
+        for name, current, candidate, suite, arch in doc["packages"]
+    ]
+    return {**result, "count": doc["count"], "packages": records}
@@ -0,0 +1,82 @@
+"""Version: 1.0.0 | Datum: 2026-10-18
+Upgrade duration history and prediction for Linux Updates.
+"""
+from __future__ import annotations
+
+from collections import deque
+from typing import Any
+
+
+def fit_duration(points: list[tuple[int, float]]) -> tuple[float, float] | None:
+    """Fit ``duration = fixed + per_package * packages`` by least squares.
+
+    ``points`` holds (packages, seconds) pairs. Both coefficients are kept
+    non-negative: a negative slope falls back to the mean duration and a
+    negative intercept to a line through the origin. Returns None without
+    points.
+    """
+    if not points:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    if sxx == 0:
+        # Every upgrade had the same size, spread the time over the packages
+        return (0.0, mean_y / mean_x) if mean_x else (mean_y, 0.0)
+
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    if slope <= 0:
+        return mean_y, 0.0
+    fixed = mean_y - slope * mean_x
+    if fixed < 0:
+        return 0.0, sum(x * y for x, y in points) / sum(x * x for x, _ in points)
+    return fixed, slope
+
+
+class UpgradeHistory:
+    """The last upgrades of one host, oldest first.
+
+    Every entry is a JSON-friendly dict with the time, success, package count,
+    download size and the total and per-phase durations in seconds.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initialize."""
+        self.entries: deque[dict[str, Any]] = deque(maxlen=size)
+        self._model: tuple[float, float] | None = None
+
+    def add(self, entry: dict[str, Any]) -> None:
+        """Remember one upgrade."""
+        self.entries.append(entry)
+        self._model = self._fit()
+
+    def restore(self, entries: list[dict[str, Any]]) -> None:
+        """Replace the history with saved entries."""
+        self.entries.clear()
+        self.entries.extend(entries)
+        self._model = self._fit()
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return the entries for storage and diagnostics."""
+        return list(self.entries)
+
+    @property
+    def model(self) -> tuple[float, float] | None:
+        """Return (fixed seconds, seconds per package), or None without history."""
+        return self._model
+
+    def predict(self, packages: int) -> float | None:
+        """Return the expected duration of upgrading ``packages`` packages."""
+        if self._model is None:
+            return None
+        fixed, per_package = self._model
+        return round(fixed + per_package * packages, 1)
+
+    def _fit(self) -> tuple[float, float] | None:
+        """Fit the model on the successful upgrades that installed something."""
+        return fit_duration([
+            (entry["packages"], entry["duration"])
+            for entry in self.entries
+            if entry.get("success") and entry.get("packages")
+        ])
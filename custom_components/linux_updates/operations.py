@@ -0,0 +1,78 @@
+"""Version: 1.0.0 | Datum: 2026-10-18
+Per-host operation queue for Linux Updates.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from .timing import OPERATION_PREFETCH, OPERATION_REBOOT, OPERATION_UPGRADE
+
+# Operations that change the host, a check while one of them is queued or
+# running would only see a half-finished state
+MUTATING_OPERATIONS = frozenset({OPERATION_UPGRADE, OPERATION_PREFETCH, OPERATION_REBOOT})
+
+
+class OperationQueue:
+    """Run the SSH operations of one host one at a time.
+
+    Every operation has a name. Asking for an operation that is already
+    queued or running returns the result of that run instead of starting
+    another, so button spam and overlapping polls cause one remote run.
+    Operations start in the order they were first requested.
+    """
+
+    def __init__(self, on_change: Callable[[], None] | None = None) -> None:
+        """Initialize.
+
+        ``on_change`` is called whenever an operation is queued, starts or ends.
+        """
+        self._lock = asyncio.Lock()
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._on_change = on_change
+        self.current: str | None = None
+
+    @property
+    def depth(self) -> int:
+        """Return the number of operations queued or running."""
+        return len(self._tasks)
+
+    @property
+    def queued(self) -> list[str]:
+        """Return the operations waiting for their turn, in order."""
+        return [name for name in self._tasks if name != self.current]
+
+    def is_pending(self, names) -> bool:
+        """Return True if any of the operations is queued or running."""
+        return any(name in self._tasks for name in names)
+
+    async def async_run(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Run ``factory()`` as operation ``name``, or join the run already pending."""
+        if (task := self._tasks.get(name)) is None:
+            task = asyncio.get_running_loop().create_task(self._async_execute(name, factory))
+            self._tasks[name] = task
+            self._changed()
+        # A caller that gives up must not cancel the run others are waiting for
+        return await asyncio.shield(task)
+
+    async def _async_execute(self, name: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Wait for the earlier operations, then run this one."""
+        try:
+            async with self._lock:
+                self.current = name
+                self._changed()
+                return await factory()
+        finally:
+            if self.current == name:
+                self.current = None
+            del self._tasks[name]
+            self._changed()
+
+    def cancel(self) -> None:
+        """Cancel everything queued or running, when the entry is unloaded."""
+        for task in self._tasks.values():
+            task.cancel()
+
+    def _changed(self) -> None:
+        if self._on_change is not None:
+            self._on_change()
@@ -0,0 +1,136 @@
+"""Version: 1.1.2 | Datum: 2026-10-18
+Rolling upgrades of many hosts for Linux Updates.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    EVENT_ROLLING_UPGRADE,
+    REBOOT_ALWAYS,
+    REBOOT_IF_REQUIRED,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+RESULT_UPGRADED = "upgraded"
+RESULT_FAILED = "failed"
+RESULT_SKIPPED = "skipped"
+
+
+def plan_waves(hosts: list, canary: list, parallelism: int) -> list[list]:
+    """Split hosts into waves: the canary group first, then ``parallelism`` at a time."""
+    rest = [host for host in hosts if host not in canary]
+    waves = [canary] if canary else []
+    waves.extend(rest[i:i + parallelism] for i in range(0, len(rest), parallelism))
+    return waves
+
+
+class RollingUpgrade:
+    """Upgrade hosts wave by wave and stop at the first sign of trouble.
+
+    Every host in a wave is upgraded concurrently, optionally rebooted and
+    waited for, and then checked again. The next wave only starts if every
+    host in the current one came through without errors.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        coordinators: list,
+        canary: list,
+        parallelism: int,
+        reboot: str,
+        reboot_timeout: float,
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self.waves = plan_waves(coordinators, canary, max(1, parallelism))
+        self.reboot = reboot
+        self.reboot_timeout = reboot_timeout
+        self.results: dict[str, dict[str, Any]] = {}
+        self.halted = False
+
+    async def async_run(self) -> dict[str, Any]:
+        """Run all waves and return the outcome per host."""
+        predicted = self.predicted_wave_durations()
+        for number, wave in enumerate(self.waves, start=1):
+            _LOGGER.info(
+                "Rolling upgrade wave %s/%s: %s",
+                number, len(self.waves), ", ".join(host.address for host in wave),
+            )
+            results = await asyncio.gather(*(self._async_upgrade_host(host) for host in wave))
+            failed = [
+                host.address for host, result in zip(wave, results) if result["status"] == RESULT_FAILED
+            ]
+            self._fire("wave_completed", wave=number, waves=len(self.waves), failed=failed)
+            if failed:
+                self.halted = True
+                _LOGGER.warning("Rolling upgrade halted after wave %s, failed: %s", number, failed)
+                for later_wave in self.waves[number:]:
+                    for host in later_wave:
+                        self.results[host.address] = {"status": RESULT_SKIPPED}
+                break
+
+        self._fire("halted" if self.halted else "completed")
+        return {
+            "status": "halted" if self.halted else "completed",
+            "waves": [[host.address for host in wave] for wave in self.waves],
+            "predicted_wave_durations": predicted,
+            "hosts": self.results,
+        }
+
+    def predicted_wave_durations(self) -> list[float | None]:
+        """Return the expected upgrade seconds of every wave.
+
+        A wave takes as long as its slowest host. None if a host of the wave
+        has no upgrade history yet.
+        """
+        durations = []
+        for wave in self.waves:
+            hosts = [host.predicted_upgrade_duration for host in wave]
+            durations.append(None if None in hosts else max(hosts, default=0.0))
+        return durations
+
+    async def _async_upgrade_host(self, coordinator) -> dict[str, Any]:
+        """Upgrade, reboot if asked to and verify one host."""
+        result: dict[str, Any] = {
+            "status": RESULT_FAILED,
+            "rebooted": False,
+            "predicted_duration": coordinator.predicted_upgrade_duration,
+        }
+        self.results[coordinator.address] = result
+
+        upgraded = await coordinator.trigger_update()
+        if coordinator.upgrade_history.entries:
+            result["duration"] = coordinator.upgrade_history.entries[-1]["duration"]
+        if not upgraded:
+            result["error"] = coordinator.error_message or "Upgrade did not run"
+            return result
+
+        if self.reboot == REBOOT_ALWAYS or (
+            self.reboot == REBOOT_IF_REQUIRED and coordinator.reboot_required
+        ):
+            if not await coordinator.trigger_reboot():
+                result["error"] = coordinator.error_message or "Reboot failed"
+                return result
+            result["rebooted"] = True
+            if not await coordinator.async_wait_until_online(self.reboot_timeout):
+                result["error"] = f"Not back within {self.reboot_timeout} s after reboot"
+                return result
+
+        if not await coordinator.async_verify():
+            result["error"] = coordinator.error_message or "Check after upgrade failed"
+            return result
+
+        result["status"] = RESULT_UPGRADED
+        result["pending_after"] = coordinator.update_count
+        return result
+
+    def _fire(self, stage: str, **data: Any) -> None:
+        """Report progress on the event bus."""
+        self.hass.bus.async_fire(EVENT_ROLLING_UPGRADE, {"stage": stage, **data})
@@ -0,0 +1,140 @@
+"""Version: 1.0.0 | Datum: 2026-10-18
+Fleet-wide index of pending packages for Linux Updates.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DATA_PACKAGE_INDEX, DOMAIN
+from .parser import PackageRecord
+
+_RecordKey = tuple[str, str | None, str, str | None, str | None]
+
+
+def _record_key(record: PackageRecord) -> _RecordKey:
+    return (record.name, record.current, record.candidate, record.suite, record.arch)
+
+
+@callback
+def get_package_index(hass: HomeAssistant) -> PackageIndex:
+    """Return the shared package index, creating it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if DATA_PACKAGE_INDEX not in domain_data:
+        domain_data[DATA_PACKAGE_INDEX] = PackageIndex()
+    return domain_data[DATA_PACKAGE_INDEX]
+
+
+class PackageIndex:
+    """Which hosts still need which package, across all config entries.
+
+    Every distinct record (same name, versions, suite and arch) and every
+    distinct string in them is stored once, and the hosts' package lists
+    point to those shared objects. A fleet on the same release then costs
+    one record per package instead of one per package and host. Records and
+    strings are reference counted and dropped with their last host.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._strings: dict[str, str] = {}
+        self._string_refs: dict[str, int] = {}
+        self._records: dict[_RecordKey, PackageRecord] = {}
+        self._record_refs: dict[PackageRecord, int] = {}
+        # Host key (coordinator unique_prefix) -> the list the host keeps, and its label
+        self._hosts: dict[str, list[PackageRecord]] = {}
+        self._labels: dict[str, str] = {}
+        # Package name -> shared record -> keys of the hosts waiting for it
+        self._by_name: dict[str, dict[PackageRecord, set[str]]] = {}
+
+    def update(self, key: str, label: str, records: list[PackageRecord]) -> list[PackageRecord]:
+        """Replace the pending packages of one host.
+
+        Only the difference to the previous list is applied. Returns the
+        list with every record replaced by its shared copy, for the host to
+        keep instead of its own.
+        """
+        old = set(self._hosts.get(key, ()))
+        new: set[PackageRecord] = set()
+        shared_records = []
+        for record in records:
+            shared = self._records.get(_record_key(record))
+            if shared is None or (shared not in old and shared not in new):
+                shared = self._acquire(record)
+                self._by_name.setdefault(shared.name, {}).setdefault(shared, set()).add(key)
+            new.add(shared)
+            shared_records.append(shared)
+        for shared in old - new:
+            waiting = self._by_name[shared.name]
+            waiting[shared].discard(key)
+            if not waiting[shared]:
+                del waiting[shared]
+            if not waiting:
+                del self._by_name[shared.name]
+            self._release(shared)
+        self._hosts[key] = shared_records
+        self._labels[key] = label
+        return shared_records
+
+    def remove(self, key: str) -> None:
+        """Forget a host, when its entry is unloaded."""
+        if key in self._hosts:
+            self.update(key, self._labels[key], [])
+            del self._hosts[key]
+            del self._labels[key]
+
+    def hosts_for(self, name: str) -> dict[str, list[PackageRecord]]:
+        """Return the records of every host still waiting for ``name``, by host label."""
+        hosts: dict[str, list[PackageRecord]] = {}
+        for record, keys in self._by_name.get(name, {}).items():
+            for key in keys:
+                hosts.setdefault(self._labels[key], []).append(record)
+        return hosts
+
+    def summary(self) -> dict[str, int]:
+        """Return the number of hosts waiting for each package, most first."""
+        counts = {
+            name: len(set().union(*waiting.values())) for name, waiting in self._by_name.items()
+        }
+        return dict(sorted(counts.items(), key=lambda item: (-item[1], item[0])))
+
+    def stats(self) -> dict[str, Any]:
+        """Return the size of the index."""
+        return {
+            "hosts": len(self._hosts),
+            "packages": len(self._by_name),
+            "records": len(self._records),
+            "strings": len(self._strings),
+            "host_records": sum(len(records) for records in self._hosts.values()),
+        }
+
+    def _acquire(self, record: PackageRecord) -> PackageRecord:
+        """Return the shared copy of ``record``, creating it on first use."""
+        if (shared := self._records.get(_record_key(record))) is None:
+            shared = PackageRecord(*(self._intern(value) for value in _record_key(record)))
+            # Keyed by the interned strings, not the caller's copies
+            self._records[_record_key(shared)] = shared
+            self._record_refs[shared] = 0
+        self._record_refs[shared] += 1
+        return shared
+
+    def _release(self, shared: PackageRecord) -> None:
+        self._record_refs[shared] -= 1
+        if self._record_refs[shared]:
+            return
+        del self._record_refs[shared]
+        del self._records[_record_key(shared)]
+        for value in _record_key(shared):
+            if value is not None:
+                self._string_refs[value] -= 1
+                if not self._string_refs[value]:
+                    del self._string_refs[value]
+                    del self._strings[value]
+
+    def _intern(self, value: str | None) -> str | None:
+        if value is None:
+            return None
+        value = self._strings.setdefault(value, value)
+        self._string_refs[value] = self._string_refs.get(value, 0) + 1
+        return value
@@ -0,0 +1,329 @@
+"""Version: 1.6.1 | Datum: 2026-10-18
+Parsers for package manager output.
+"""
+from __future__ import annotations
+
+import re
+from datetime import datetime
+from typing import Any
+
+_REBOOT_MARKER = "reboot-required:"
+_HISTORY_MARKER = "history-log: "
+
+# Another process holds the package manager's lock (apt, yum, zypper, pacman, apk)
+_LOCK_RE = re.compile(
+    r"Could not get lock|Unable to acquire the dpkg frontend lock|Unable to lock directory"
+    r"|Another app is currently holding the yum lock|System management is locked"
+    r"|unable to lock database",
+    re.IGNORECASE,
+)
+# Looks for: "It is held by process 1234 (unattended-upgr)" or "with pid 1234 (zypper)"
+_LOCK_HOLDER_RE = re.compile(r"(?:process|pid) (\d+) \(([^)]+)\)")
+
+# One package in a history.log transaction, e.g. in
+#   "Upgrade: libssl3:amd64 (3.0.2-0ubuntu1.12, 3.0.2-0ubuntu1.13), tzdata:all (2024a-1, 2024b-1)"
+#   "Install: linux-image-6.1.0-18-amd64:amd64 (6.1.76-1, automatic)"
+_HISTORY_PACKAGE_RE = re.compile(r"(?P<name>[^\s,()]+) \((?P<versions>[^)]*)\)")
+# Sections whose packages are installed in the (last) version listed
+_HISTORY_INSTALLED = ("Install", "Upgrade", "Downgrade", "Reinstall")
+_HISTORY_REMOVED = ("Remove", "Purge")
+
+# Looks for: "26 upgraded, 0 newly installed, 0 to remove and 1 not upgraded."
+_SUMMARY_RE = re.compile(r"^(\d+) upgraded, \d+ newly installed,")
+
+# Looks for:
+#   "Inst bash [5.1-2] (5.1-2+deb11u1 Debian-Security:11/stable-security [amd64])"
+#   "Inst libfoo (1.2 Ubuntu:22.04/jammy-updates, Ubuntu:22.04/jammy-security [amd64]) []"
+_INST_RE = re.compile(
+    r"^Inst (?P<name>\S+)"
+    r"(?: \[(?P<current>[^\]]*)\])?"
+    r" \((?P<candidate>\S+) (?P<suite>[^,\s]+)[^\[]*\[(?P<arch>[^\]]+)\]\)"
+)
+
+# Looks for: "busybox-1.36.1-r5          < 1.36.1-r6"
+_APK_RE = re.compile(r"^(?P<name>\S+?)-(?P<current>\d\S*)\s+<\s+(?P<candidate>\S+)")
+
+# Download size lines:
+#   apt:    "Need to get 1,234 kB of archives." / "Need to get 0 B/52.1 MB of archives."
+#   dnf:    "Total download size: 52 M"
+#   pacman: "Total Download Size:   12.34 MiB"
+#   zypper: "Overall download size: 12.3 MiB. Already cached: 0 B."
+_DOWNLOAD_SIZE_RE = re.compile(
+    r"^(?:Need to get|Total [Dd]ownload [Ss]ize:|Overall download size:)\s+"
+    r"(?:[\d.,]+ ?[A-Za-z]*/)?(?P<value>[\d.,]+) ?(?P<unit>[kKMGT]?i?B?)\b"
+)
+_SIZE_UNITS = {
+    "": 1, "B": 1,
+    "kB": 1000, "MB": 1000**2, "GB": 1000**3, "TB": 1000**4,
+    "k": 1024, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4,
+    "KB": 1024, "KiB": 1024, "MiB": 1024**2, "GiB": 1024**3, "TiB": 1024**4,
+}
+
+
+class PackageRecord:
+    """One pending package upgrade."""
+
+    __slots__ = ("name", "current", "candidate", "suite", "arch")
+
+    def __init__(
+        self,
+        name: str,
+        current: str | None,
+        candidate: str,
+        suite: str | None = None,
+        arch: str | None = None,
+    ) -> None:
+        """Initialize."""
+        self.name = name
+        self.current = current
+        self.candidate = candidate
+        self.suite = suite
+        self.arch = arch
+
+    def __repr__(self) -> str:
+        return f"PackageRecord({self.name} {self.current} -> {self.candidate})"
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the record as a JSON-friendly dict."""
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+
+class AptTransaction:
+    """One completed transaction from apt's history.log."""
+
+    __slots__ = ("end", "installed", "removed", "upgrades")
+
+    def __init__(self, end: datetime) -> None:
+        """Initialize.
+
+        ``installed`` maps "name:arch" to the version now installed and
+        ``removed`` holds the "name:arch" of removed packages. ``upgrades``
+        is True if the transaction upgraded or downgraded anything.
+        """
+        self.end = end
+        self.installed: dict[str, str] = {}
+        self.removed: set[str] = set()
+        self.upgrades = False
+
+    def __repr__(self) -> str:
+        return f"AptTransaction({self.end} +{len(self.installed)} -{len(self.removed)})"
+
+
+def record_key(record: PackageRecord) -> str:
+    """Return the "name:arch" key history.log uses for a pending package."""
+    if ":" in record.name or not record.arch:
+        return record.name
+    return f"{record.name}:{record.arch}"
+
+
+def parse_apt_simulate(output: str) -> tuple[int, list[PackageRecord]]:
+    """Parse 'apt-get -s upgrade' output in one pass.
+
+    Returns the number of upgrades from apt's summary line together with one
+    record per ``Inst`` line. ``Conf`` and other lines are skipped.
+    """
+    count = None
+    records = []
+    for line in output.splitlines():
+        if line.startswith("Inst "):
+            if match := _INST_RE.match(line):
+                records.append(PackageRecord(
+                    match["name"],
+                    match["current"],
+                    match["candidate"],
+                    match["suite"],
+                    match["arch"],
+                ))
+        elif count is None and (match := _SUMMARY_RE.match(line)):
+            count = int(match.group(1))
+
+    return (len(records) if count is None else count), records
+
+
+def parse_dnf_check_update(output: str) -> tuple[int, list[PackageRecord]]:
+    """Parse 'dnf -q check-update' (or yum) output.
+
+    Lines are ``name.arch  version-release  repo``. Long names make dnf wrap
+    the rest of the row onto the next line, and the "Obsoleting Packages"
+    section that may follow is not part of the upgrade list.
+    """
+    records = []
+    pending = []
+    for line in output.splitlines():
+        if line.startswith("Obsoleting"):
+            break
+        fields = pending + line.split()
+        if not fields:
+            continue
+        if len(fields) < 3:
+            pending = fields
+            continue
+        pending = []
+        if len(fields) != 3 or "." not in fields[0]:
+            continue
+        name, arch = fields[0].rsplit(".", 1)
+        records.append(PackageRecord(name, None, fields[1], fields[2], arch))
+    return len(records), records
+
+
+def parse_pacman_query(output: str) -> tuple[int, list[PackageRecord]]:
+    """Parse 'pacman -Qu' output: ``name oldver -> newver [ignored]``."""
+    records = []
+    for line in output.splitlines():
+        fields = line.split()
+        if len(fields) != 4 or fields[2] != "->":
+            continue
+        records.append(PackageRecord(fields[0], fields[1], fields[3]))
+    return len(records), records
+
+
+def parse_zypper_list_updates(output: str) -> tuple[int, list[PackageRecord]]:
+    """Parse the table printed by 'zypper list-updates'.
+
+    Columns: status | repository | name | current | available | arch.
+    """
+    records = []
+    for line in output.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) != 6 or fields[0] not in ("v", ""):
+            continue
+        _status, repo, name, current, candidate, arch = fields
+        if not name or name == "Name":
+            continue
+        records.append(PackageRecord(name, current or None, candidate, repo, arch))
+    return len(records), records
+
+
+def parse_apk_version(output: str) -> tuple[int, list[PackageRecord]]:
+    """Parse "apk version -l '<'" output."""
+    records = []
+    for line in output.splitlines():
+        if match := _APK_RE.match(line):
+            records.append(PackageRecord(match["name"], match["current"], match["candidate"]))
+    return len(records), records
+
+
+def parse_download_size(line: str) -> int | None:
+    """Return the total archive size in bytes if the line announces it.
+
+    apt counts in SI units (kB = 1000), dnf, pacman and zypper in binary ones.
+    For apt's "X/Y" form the total Y is returned, including what is already
+    in the cache.
+    """
+    if (match := _DOWNLOAD_SIZE_RE.match(line)) is None:
+        return None
+    multiplier = _SIZE_UNITS.get(match["unit"])
+    if multiplier is None:
+        return None
+    return int(float(match["value"].replace(",", "")) * multiplier)
+
+
+def parse_fingerprint(output: str) -> tuple[str, int]:
+    """Parse the output of CMD_FINGERPRINT.
+
+    Returns the fingerprint (``mtime:size`` of the package manager's metadata
+    cache and its database of installed packages) and the age of the metadata
+    in seconds, measured with the host's own clock.
+    """
+    now, *stats = output.partition(_REBOOT_MARKER)[0].split()
+    if len(stats) != 2:
+        raise ValueError(f"Unexpected fingerprint output: {output!r}")
+    lists_mtime = int(stats[0].split(":", 1)[0])
+    return " ".join(stats), int(now) - lists_mtime
+
+
+def parse_reboot_required(output: str) -> tuple[bool | None, list[str]]:
+    """Parse the CMD_REBOOT_REQUIRED part of a fingerprint output.
+
+    Returns whether a reboot is required and the packages that asked for it,
+    or None if the output has no such part (package managers without a
+    reboot-required file).
+    """
+    _, marker, rest = output.partition(_REBOOT_MARKER)
+    if not marker:
+        return None, []
+    answer, *packages = rest.split()
+    if answer != "yes":
+        return False, []
+    # A package may be listed once per triggering update
+    return True, list(dict.fromkeys(packages))
+
+
+def split_history_log(output: bytes) -> tuple[str, bytes | None]:
+    """Split a raw command output at the apt_history_command part, if any.
+
+    The output is read as bytes since the log part may end in a character
+    cut by the size limit, and its offsets count bytes. The part before it
+    is returned decoded.
+    """
+    head, marker, tail = output.partition(_HISTORY_MARKER.encode())
+    return head.decode(errors="replace"), (tail if marker else None)
+
+
+def parse_apt_history(output: bytes) -> tuple[int, int, list[AptTransaction]] | None:
+    """Parse the part of an output after the apt_history_command header.
+
+    Returns the log's inode, the offset to continue from next time and the
+    completed transactions. A transaction still being written (no End-Date
+    yet, or cut by the size limit) is left for the next call, the offset
+    then stops right before it. None if the header is garbled.
+    """
+    header, _, log = output.partition(b"\n")
+    try:
+        inode, offset, utc_offset = header.decode(errors="replace").split()
+        inode, offset = int(inode), int(offset)
+    except ValueError:
+        return None
+
+    transactions = []
+    transaction = None
+    consumed = position = 0
+    for line in log.splitlines(keepends=True):
+        position += len(line)
+        if not line.endswith(b"\n"):
+            break
+        key, _, value = line.decode(errors="replace").partition(": ")
+        value = value.strip()
+        if key == "Start-Date":
+            transaction = AptTransaction(datetime.min)
+        elif transaction is None:
+            continue
+        elif key in _HISTORY_INSTALLED:
+            for match in _HISTORY_PACKAGE_RE.finditer(value):
+                versions = [version.strip() for version in match["versions"].split(",")]
+                # Install lists "(version, automatic)", the others "(old, new)"
+                version = versions[0] if key == "Install" else versions[-1]
+                transaction.installed[match["name"]] = version
+                transaction.removed.discard(match["name"])
+            transaction.upgrades |= key in ("Upgrade", "Downgrade")
+        elif key in _HISTORY_REMOVED:
+            for match in _HISTORY_PACKAGE_RE.finditer(value):
+                transaction.removed.add(match["name"])
+                transaction.installed.pop(match["name"], None)
+        elif key == "End-Date":
+            try:
+                transaction.end = datetime.strptime(
+                    f"{' '.join(value.split())} {utc_offset}", "%Y-%m-%d %H:%M:%S %z"
+                )
+            except ValueError:
+                # Not worth getting stuck on, skip the transaction
+                transaction = None
+                consumed = position
+                continue
+            transactions.append(transaction)
+            transaction = None
+            consumed = position
+    return inode, offset + consumed, transactions
+
+
+def parse_lock_contention(line: str) -> str | None:
+    """Return who holds the package manager lock if ``line`` reports contention.
+
+    The holder is "name (pid N)" when the package manager tells, otherwise
+    "another process". None if the line is not about the lock.
+    """
+    if not _LOCK_RE.search(line):
+        return None
+    if (match := _LOCK_HOLDER_RE.search(line)) is not None:
+        return f"{match.group(2)} (pid {match.group(1)})"
+    return "another process"
@@ -0,0 +1,128 @@
+"""Version: 1.2.1 | Datum: 2026-10-18
+Live progress tracking for streamed apt upgrades.
+"""
+from __future__ import annotations
+
+import re
+import time
+from collections import deque
+
+PHASE_IDLE = "idle"
+PHASE_UPDATING = "updating_lists"
+PHASE_RESOLVING = "resolving"
+PHASE_DOWNLOADING = "downloading"
+PHASE_UNPACKING = "unpacking"
+PHASE_CONFIGURING = "configuring"
+PHASE_AUTOREMOVE = "autoremove"
+PHASE_WAITING_FOR_LOCK = "waiting_for_lock"  # Another process holds the dpkg lock
+PHASE_DONE = "done"
+PHASE_FAILED = "failed"
+
+# Looks for: "26 upgraded, 2 newly installed, 0 to remove and 1 not upgraded."
+_SUMMARY_RE = re.compile(r"^(\d+) upgraded, (\d+) newly installed, (\d+) to remove")
+
+
+class UpgradeProgress:
+    """Follow apt/dpkg output line by line and estimate overall progress.
+
+    Each package goes through three steps (download, unpack, set up), so the
+    percentage is the number of finished steps over three times the number of
+    packages announced in apt's summary line. Packages already in apt's
+    cache (e.g. after a prefetch) print no ``Get:`` line, their download step
+    counts as done once unpacking starts. Only the last ``max_lines``
+    lines of output are kept. The time spent in every phase is summed in
+    ``durations``.
+    """
+
+    def __init__(self, max_lines: int) -> None:
+        """Initialize."""
+        self.output: deque[str] = deque(maxlen=max_lines)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous run."""
+        self.output.clear()
+        self._phase = PHASE_IDLE
+        self._phase_started = None
+        self.durations: dict[str, float] = {}
+        self.total = 0
+        self.downloaded = 0
+        self.unpacked = 0
+        self.configured = 0
+        self.current_package = None
+        self._summary_seen = False
+
+    def start(self) -> None:
+        """Mark the beginning of a new run."""
+        self.reset()
+        self.phase = PHASE_UPDATING
+
+    def finish(self, success: bool) -> None:
+        """Mark the end of the run."""
+        self.phase = PHASE_DONE if success else PHASE_FAILED
+        self.current_package = None
+
+    @property
+    def phase(self) -> str:
+        """Return the current phase."""
+        return self._phase
+
+    @phase.setter
+    def phase(self, value: str) -> None:
+        """Enter a phase, adding the time spent in the previous one."""
+        now = time.monotonic()
+        if self._phase_started is not None:
+            self.durations[self._phase] = (
+                self.durations.get(self._phase, 0.0) + now - self._phase_started
+            )
+        self._phase = value
+        self._phase_started = None if value in (PHASE_DONE, PHASE_FAILED) else now
+
+    @property
+    def running(self) -> bool:
+        """Return True while an upgrade is in progress."""
+        return self.phase not in (PHASE_IDLE, PHASE_DONE, PHASE_FAILED)
+
+    @property
+    def percentage(self) -> int:
+        """Return the estimated progress in percent."""
+        if self.phase == PHASE_DONE:
+            return 100
+        if not self.total:
+            return 0
+        steps = self.downloaded + self.unpacked + self.configured
+        return min(99, steps * 100 // (3 * self.total))
+
+    def feed(self, line: str) -> bool:
+        """Consume one line of output. Return True if the progress changed."""
+        line = line.rstrip()
+        if not line:
+            return False
+        self.output.append(line)
+        before = (self.phase, self.percentage)
+
+        if line.startswith("Get:"):
+            if self._summary_seen:
+                self.phase = PHASE_DOWNLOADING
+                self.downloaded += 1
+        elif line.startswith("Unpacking "):
+            self.phase = PHASE_UNPACKING
+            # apt fetches every archive before dpkg starts, the rest was cached
+            self.downloaded = max(self.downloaded, self.total)
+            self.unpacked += 1
+            self.current_package = line.split()[1]
+        elif line.startswith("Setting up "):
+            self.phase = PHASE_CONFIGURING
+            self.configured += 1
+            self.current_package = line.split()[2]
+        elif line.startswith("Removing "):
+            self.phase = PHASE_AUTOREMOVE
+            self.current_package = line.split()[1]
+        elif line.startswith("Reading package lists") and self.phase == PHASE_UPDATING:
+            # 'apt-get update' prints this as its last line
+            self.phase = PHASE_RESOLVING
+        elif (match := _SUMMARY_RE.match(line)) and not self._summary_seen:
+            self._summary_seen = True
+            self.total = int(match.group(1)) + int(match.group(2))
+
+        return (self.phase, self.percentage) != before
@@ -0,0 +1,69 @@
+"""Version: 1.1.0 | Datum: 2026-10-18
+Adaptive poll scheduling for Linux Updates.
+"""
+from __future__ import annotations
+
+import hashlib
+from datetime import timedelta
+
+from .const import (
+    POLL_JITTER,
+    POLL_MIN_INTERVAL,
+    POLL_RETRY_INTERVAL,
+    POLL_FRESH_LISTS_AGE,
+    POLL_FRESH_FACTOR,
+    POLL_QUIET_STEP,
+    POLL_QUIET_MAX_FACTOR,
+)
+
+
+class PollScheduler:
+    """Decide when a host should be polled next.
+
+    - Every host gets a fixed jitter derived from its name, so entries created
+      together drift apart instead of polling in lockstep.
+    - After SSH failures the next attempt comes quickly and then backs off
+      exponentially, never waiting longer than the configured interval.
+    - While the apt lists are fresh (apt-daily or unattended-upgrades just
+      ran) the host is polled more often.
+    - Every poll that finds nothing new stretches the interval a bit, up to
+      a limit, and any change resets it.
+    """
+
+    def __init__(self, base_interval: timedelta, seed: str) -> None:
+        """Initialize."""
+        self.base_interval = base_interval
+        digest = hashlib.sha256(seed.encode()).digest()
+        # Deterministic value in [-POLL_JITTER, +POLL_JITTER]
+        self.jitter = (int.from_bytes(digest[:4], "big") / 0xFFFFFFFF * 2 - 1) * POLL_JITTER
+        # Deterministic value in [0, 1), spreads scheduled jobs like the prefetch
+        self.offset = int.from_bytes(digest[4:8], "big") / 0x100000000
+        self.failures = 0
+        self.quiet_polls = 0
+        self.lists_age: int | None = None
+
+    def record_success(self, changed: bool, lists_age: int | None) -> None:
+        """Remember the outcome of a successful poll."""
+        self.failures = 0
+        self.quiet_polls = 0 if changed else self.quiet_polls + 1
+        self.lists_age = lists_age
+
+    def record_failure(self) -> None:
+        """Remember a failed poll."""
+        self.failures += 1
+
+    def next_interval(self) -> timedelta:
+        """Return the delay until the next poll."""
+        base = self.base_interval.total_seconds()
+
+        if self.failures:
+            retry = POLL_RETRY_INTERVAL * 2 ** (self.failures - 1)
+            return timedelta(seconds=min(base, retry))
+
+        if self.lists_age is not None and self.lists_age < POLL_FRESH_LISTS_AGE:
+            seconds = base * POLL_FRESH_FACTOR
+        else:
+            seconds = base * min(POLL_QUIET_MAX_FACTOR, 1 + POLL_QUIET_STEP * self.quiet_polls)
+
+        seconds = max(POLL_MIN_INTERVAL, seconds * (1 + self.jitter))
+        return timedelta(seconds=seconds)
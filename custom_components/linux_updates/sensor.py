@@ -1,14 +1,29 @@
-"""Version: 1.5.0 | Datum: 2025-12-19
+"""Version: 1.13.0 | Datum: 2026-10-18
 Sensors for Linux Updates.
 """
 from datetime import datetime
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EntityCategory, UnitOfInformation, UnitOfTime
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, ATTR_PACKAGES
+from .const import DOMAIN, ATTR_PACKAGES, ATTR_PACKAGES_TRUNCATED, MAX_PACKAGES_IN_STATE
+from .timing import OPERATION_CHECK, PHASES
+
+_PHASE_NAMES = {
+    "dns": "DNS",
+    "tcp": "TCP",
+    "handshake": "Handshake",
+    "remote": "Remote",
+    "parse": "Parse",
+    "total": "Total",
+}
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -16,13 +31,25 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensors."""
-    coordinator = hass.data[DOMAIN][entry.entry_id]
+    entities = []
+    for coordinator in hass.data[DOMAIN][entry.entry_id].host_coordinators:
+        entities.extend([
+            LinuxUpdatesSensor(coordinator),
+            LinuxLastCheckSensor(coordinator),
+            LinuxLastUpdateSensor(coordinator),
+            LinuxUpgradeProgressSensor(coordinator),
+            LinuxUpgradePhaseSensor(coordinator),
+            LinuxPrefetchedPackagesSensor(coordinator),
+            LinuxPrefetchedSizeSensor(coordinator),
+            LinuxOperationQueueSensor(coordinator),
+            LinuxRebootDowntimeSensor(coordinator),
+            LinuxPredictedUpgradeDurationSensor(coordinator),
+        ])
+        entities.extend(
+            LinuxCheckTimingSensor(coordinator, phase) for phase in PHASES
+        )
 
-    async_add_entities([
-        LinuxUpdatesSensor(coordinator),
-        LinuxLastCheckSensor(coordinator),
-        LinuxLastUpdateSensor(coordinator)
-    ])
+    async_add_entities(entities)
 
 class LinuxUpdatesSensor(CoordinatorEntity, SensorEntity):
     """Representation of a Sensor."""
@@ -30,10 +57,12 @@ class LinuxUpdatesSensor(CoordinatorEntity, SensorEntity):
     _attr_icon = "mdi:package-variant"
     _attr_native_unit_of_measurement = "updates"
     _attr_has_entity_name = True # Låter HA hantera namnsättningen snyggt
+    # Paketlistan skrivs inte till recordern, hela listan finns via tjänsten get_packages
+    _unrecorded_attributes = frozenset({ATTR_PACKAGES, ATTR_PACKAGES_TRUNCATED})
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_pending_updates"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_pending_updates"
         self._attr_name = "Pending Updates" # Rent namn
 
     @property
@@ -47,9 +76,11 @@ class LinuxUpdatesSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def extra_state_attributes(self):
-        """Return the state attributes."""
+        """Return the state attributes (a bounded summary of the package list)."""
+        packages = self.coordinator.packages
         return {
-            ATTR_PACKAGES: self.coordinator.packages
+            ATTR_PACKAGES: packages[:MAX_PACKAGES_IN_STATE],
+            ATTR_PACKAGES_TRUNCATED: len(packages) > MAX_PACKAGES_IN_STATE,
         }
 
 class LinuxLastCheckSensor(CoordinatorEntity, SensorEntity):
@@ -60,7 +91,7 @@ class LinuxLastCheckSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_last_check"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_last_check"
         self._attr_name = "Last Check Success" # Rent namn
 
     @property
@@ -82,7 +113,7 @@ class LinuxLastUpdateSensor(CoordinatorEntity, SensorEntity):
 
     def __init__(self, coordinator):
         super().__init__(coordinator)
-        self._attr_unique_id = f"{coordinator.entry.entry_id}_last_update"
+        self._attr_unique_id = f"{coordinator.unique_prefix}_last_update"
         self._attr_name = "Last Upgrade Success" # Rent namn
 
     @property
@@ -92,7 +123,224 @@ class LinuxLastUpdateSensor(CoordinatorEntity, SensorEntity):
     @property
     def native_value(self):
         # Safety check: Ensure we only return a datetime object
-        val = self.coordinator.last_update_success
+        val = self.coordinator.last_upgrade_success
         if isinstance(val, datetime):
             return val
-        return None
\ No newline at end of file
+        return None
+
+class LinuxUpgradeProgressSensor(CoordinatorEntity, SensorEntity):
+    """Estimated progress of a running upgrade."""
+    _attr_icon = "mdi:progress-download"
+    _attr_native_unit_of_measurement = "%"
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_upgrade_progress"
+        self._attr_name = "Upgrade Progress"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        return self.coordinator.upgrade_progress.percentage
+
+class LinuxUpgradePhaseSensor(CoordinatorEntity, SensorEntity):
+    """Current phase of a running upgrade (downloading, unpacking...)."""
+    _attr_icon = "mdi:progress-wrench"
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_upgrade_phase"
+        self._attr_name = "Upgrade Phase"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        return self.coordinator.upgrade_progress.phase
+
+    @property
+    def extra_state_attributes(self):
+        progress = self.coordinator.upgrade_progress
+        return {
+            "current_package": progress.current_package,
+            "packages_total": progress.total,
+        }
+
+class LinuxPrefetchedPackagesSensor(CoordinatorEntity, SensorEntity):
+    """Number of packages downloaded ahead of the upgrade."""
+    _attr_icon = "mdi:package-down"
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_prefetched_packages"
+        self._attr_name = "Prefetched Packages"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        prefetch = self.coordinator.prefetch
+        return prefetch["packages"] if prefetch else 0
+
+    @property
+    def extra_state_attributes(self):
+        prefetch = self.coordinator.prefetch
+        return {"prefetched_at": prefetch["time"] if prefetch else None}
+
+class LinuxPrefetchedSizeSensor(CoordinatorEntity, SensorEntity):
+    """Download size of the prefetched packages, as reported by the package manager."""
+    _attr_icon = "mdi:download"
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.DATA_SIZE
+    _attr_native_unit_of_measurement = UnitOfInformation.BYTES
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_prefetched_size"
+        self._attr_name = "Prefetched Size"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        prefetch = self.coordinator.prefetch
+        return prefetch["bytes"] if prefetch else None
+
+class LinuxPredictedUpgradeDurationSensor(CoordinatorEntity, SensorEntity):
+    """Expected duration of upgrading the pending packages, from past upgrades."""
+    _attr_icon = "mdi:timer-cog-outline"
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_predicted_upgrade_duration"
+        self._attr_name = "Predicted Upgrade Duration"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        return self.coordinator.predicted_upgrade_duration
+
+    @property
+    def extra_state_attributes(self):
+        history = self.coordinator.upgrade_history
+        model = history.model
+        last = history.entries[-1] if history.entries else None
+        return {
+            "fixed_seconds": round(model[0], 1) if model else None,
+            "seconds_per_package": round(model[1], 2) if model else None,
+            "samples": len(history.entries),
+            "last_duration": last["duration"] if last else None,
+            "last_packages": last["packages"] if last else None,
+        }
+
+class LinuxRebootDowntimeSensor(CoordinatorEntity, SensorEntity):
+    """How long the host was unreachable during its last tracked reboot."""
+    _attr_icon = "mdi:timer-sand"
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.SECONDS
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_reboot_downtime"
+        self._attr_name = "Reboot Downtime"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        return self.coordinator.reboot_downtime
+
+    @property
+    def extra_state_attributes(self):
+        return {
+            "rebooting": self.coordinator.rebooting,
+            "reboot_started": self.coordinator.reboot_started,
+        }
+
+class LinuxOperationQueueSensor(CoordinatorEntity, SensorEntity):
+    """Number of operations queued or running on the host (diagnostic)."""
+    _attr_icon = "mdi:tray-full"
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, coordinator):
+        super().__init__(coordinator)
+        self._attr_unique_id = f"{coordinator.unique_prefix}_operation_queue"
+        self._attr_name = "Operation Queue"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        return self.coordinator.operations.depth
+
+    @property
+    def extra_state_attributes(self):
+        operations = self.coordinator.operations
+        return {
+            "current_operation": operations.current,
+            "queued_operations": operations.queued,
+        }
+
+class LinuxCheckTimingSensor(CoordinatorEntity, SensorEntity):
+    """Median duration of one phase of the update check (diagnostic)."""
+    _attr_icon = "mdi:timer-outline"
+    _attr_has_entity_name = True
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(self, coordinator, phase):
+        super().__init__(coordinator)
+        self._phase = phase
+        self._attr_unique_id = f"{coordinator.unique_prefix}_check_time_{phase}"
+        self._attr_name = f"Check Time {_PHASE_NAMES[phase]}"
+
+    @property
+    def device_info(self):
+        return self.coordinator.device_info
+
+    @property
+    def native_value(self):
+        """Return the median of the rolling window."""
+        histogram = self.coordinator.timings.get(OPERATION_CHECK, self._phase)
+        return histogram.summary()["p50_ms"] if histogram else None
+
+    @property
+    def extra_state_attributes(self):
+        histogram = self.coordinator.timings.get(OPERATION_CHECK, self._phase)
+        if histogram is None:
+            return None
+        summary = histogram.summary()
+        return {
+            "last_ms": summary["last_ms"],
+            "p90_ms": summary["p90_ms"],
+            "max_ms": summary["max_ms"],
+            "samples": summary["samples"],
+        }
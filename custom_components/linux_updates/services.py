@@ -0,0 +1,222 @@
+"""Version: 1.3.1 | Datum: 2026-10-18
+Services and websocket commands for Linux Updates.
+"""
+from __future__ import annotations
+
+from typing import Any, Iterator
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    DOMAIN,
+    ATTR_HOST,
+    ATTR_HOSTS,
+    ATTR_PACKAGE,
+    ATTR_CANARY,
+    ATTR_CANARY_COUNT,
+    ATTR_PARALLELISM,
+    ATTR_REBOOT,
+    ATTR_REBOOT_TIMEOUT,
+    DATA_ROLLING_UPGRADE,
+    DEFAULT_CANARY_COUNT,
+    DEFAULT_REBOOT_TIMEOUT,
+    DEFAULT_ROLLING_PARALLELISM,
+    REBOOT_ALWAYS,
+    REBOOT_IF_REQUIRED,
+    REBOOT_NEVER,
+    SERVICE_FIND_PACKAGE,
+    SERVICE_GET_PACKAGES,
+    SERVICE_ROLLING_UPGRADE,
+    WS_TYPE_PACKAGE_INDEX,
+    WS_TYPE_PACKAGES,
+)
+from .orchestrator import RollingUpgrade
+from .package_index import get_package_index
+
+GET_PACKAGES_SCHEMA = vol.Schema({vol.Optional(ATTR_HOST): str})
+FIND_PACKAGE_SCHEMA = vol.Schema({vol.Optional(ATTR_PACKAGE): str})
+
+ROLLING_UPGRADE_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_HOSTS): vol.All(cv.ensure_list, [str]),
+    vol.Optional(ATTR_CANARY): vol.All(cv.ensure_list, [str]),
+    vol.Optional(ATTR_CANARY_COUNT, default=DEFAULT_CANARY_COUNT): vol.All(vol.Coerce(int), vol.Range(min=0)),
+    vol.Optional(ATTR_PARALLELISM, default=DEFAULT_ROLLING_PARALLELISM): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    vol.Optional(ATTR_REBOOT, default=REBOOT_NEVER): vol.In(
+        [REBOOT_NEVER, REBOOT_IF_REQUIRED, REBOOT_ALWAYS]
+    ),
+    vol.Optional(ATTR_REBOOT_TIMEOUT, default=DEFAULT_REBOOT_TIMEOUT): vol.All(vol.Coerce(int), vol.Range(min=30)),
+})
+
+
+def iter_host_coordinators(hass: HomeAssistant) -> Iterator:
+    """Yield the coordinator of every host in every loaded config entry."""
+    domain_data = hass.data.get(DOMAIN, {})
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if (coordinator := domain_data.get(entry.entry_id)) is not None:
+            yield from coordinator.host_coordinators
+
+
+def _host_matches(coordinator, host: str) -> bool:
+    """Return True if ``host`` names the coordinator's host, with or without its port."""
+    return host in (coordinator.host, coordinator.address)
+
+
+def _packages_response(hass: HomeAssistant, host: str | None) -> dict[str, Any]:
+    """Return the full package list per host, optionally for one host only."""
+    return {
+        "hosts": {
+            coordinator.address: {
+                "count": coordinator.update_count,
+                "packages": [record.as_dict() for record in coordinator.package_records],
+            }
+            for coordinator in iter_host_coordinators(hass)
+            if host is None or _host_matches(coordinator, host)
+        }
+    }
+
+
+def _package_index_response(hass: HomeAssistant, package: str | None) -> dict[str, Any]:
+    """Return the hosts still waiting for one package, or the host count per package.
+
+    Answered from the fleet-wide index, no host is contacted.
+    """
+    index = get_package_index(hass)
+    if package is None:
+        return {"packages": index.summary(), "stats": index.stats()}
+    hosts = index.hosts_for(package)
+    return {
+        "package": package,
+        "count": len(hosts),
+        "hosts": {
+            host: [record.as_dict() for record in records] for host, records in hosts.items()
+        },
+    }
+
+
+def _select_hosts(hass: HomeAssistant, data: dict[str, Any]) -> tuple[list, list]:
+    """Return the hosts to upgrade and the canary group among them.
+
+    Without an explicit host list every host with pending updates is chosen.
+    """
+    coordinators = list(iter_host_coordinators(hass))
+    if ATTR_HOSTS in data:
+        by_host = {
+            host: [c for c in coordinators if _host_matches(c, host)] for host in data[ATTR_HOSTS]
+        }
+        if unknown := [host for host, matches in by_host.items() if not matches]:
+            raise ServiceValidationError(f"Unknown hosts: {', '.join(unknown)}")
+        selected = list(dict.fromkeys(c for matches in by_host.values() for c in matches))
+    else:
+        selected = [coordinator for coordinator in coordinators if coordinator.update_count]
+
+    if ATTR_CANARY in data:
+        if stray := [
+            host for host in data[ATTR_CANARY] if not any(_host_matches(c, host) for c in selected)
+        ]:
+            raise ServiceValidationError(f"Canary hosts not selected: {', '.join(stray)}")
+        canary = [
+            coordinator for coordinator in selected
+            if any(_host_matches(coordinator, host) for host in data[ATTR_CANARY])
+        ]
+    else:
+        canary = selected[:data[ATTR_CANARY_COUNT]]
+    return selected, canary
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services and websocket commands."""
+
+    async def async_get_packages(call: ServiceCall) -> ServiceResponse:
+        """Return the pending packages, which are kept out of entity state."""
+        return _packages_response(hass, call.data.get(ATTR_HOST))
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_PACKAGES,
+        async_get_packages,
+        schema=GET_PACKAGES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    websocket_api.async_register_command(hass, websocket_get_packages)
+
+    async def async_find_package(call: ServiceCall) -> ServiceResponse:
+        """Return which hosts still need a package, or how many need each."""
+        return _package_index_response(hass, call.data.get(ATTR_PACKAGE))
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_FIND_PACKAGE,
+        async_find_package,
+        schema=FIND_PACKAGE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    websocket_api.async_register_command(hass, websocket_package_index)
+
+    async def async_rolling_upgrade(call: ServiceCall) -> ServiceResponse:
+        """Upgrade the selected hosts in waves, canary group first."""
+        domain_data = hass.data.setdefault(DOMAIN, {})
+        if domain_data.get(DATA_ROLLING_UPGRADE) is not None:
+            raise HomeAssistantError("A rolling upgrade is already running")
+
+        selected, canary = _select_hosts(hass, call.data)
+        upgrade = RollingUpgrade(
+            hass,
+            selected,
+            canary,
+            call.data[ATTR_PARALLELISM],
+            call.data[ATTR_REBOOT],
+            call.data[ATTR_REBOOT_TIMEOUT],
+        )
+        domain_data[DATA_ROLLING_UPGRADE] = upgrade
+        try:
+            return await upgrade.async_run()
+        finally:
+            domain_data.pop(DATA_ROLLING_UPGRADE, None)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_ROLLING_UPGRADE,
+        async_rolling_upgrade,
+        schema=ROLLING_UPGRADE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_PACKAGES,
+        vol.Optional(ATTR_HOST): str,
+    }
+)
+@callback
+def websocket_get_packages(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return the pending packages over the websocket API."""
+    connection.send_result(msg["id"], _packages_response(hass, msg.get(ATTR_HOST)))
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_PACKAGE_INDEX,
+        vol.Optional(ATTR_PACKAGE): str,
+    }
+)
+@callback
+def websocket_package_index(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Query the fleet-wide package index over the websocket API."""
+    connection.send_result(msg["id"], _package_index_response(hass, msg.get(ATTR_PACKAGE)))
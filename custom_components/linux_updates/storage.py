@@ -0,0 +1,68 @@
+"""Version: 1.0.0 | Datum: 2026-10-18
+Persisted last known state for Linux Updates.
+
+The last result of every host is saved so that entities have their values
+right after a restart, before the first SSH round trip has finished.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STORAGE_VERSION, STORAGE_SAVE_DELAY
+
+
+def storage_key(entry_id: str) -> str:
+    """Return the Store key of a config entry."""
+    return f"{DOMAIN}.{entry_id}"
+
+
+class EntryStore:
+    """Last known state of every host of one config entry, in one file."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize."""
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, storage_key(entry_id))
+        self._hosts: dict[str, dict[str, Any]] = {}
+        self._coordinators = []
+
+    async def async_load(self) -> None:
+        """Read the saved state from disk."""
+        data = await self._store.async_load() or {}
+        self._hosts = data.get("hosts", {})
+
+    def async_restore(self, coordinators) -> bool:
+        """Restore every coordinator that has saved state.
+
+        The coordinators are attached to the store and saved from then on.
+        Returns True if at least one of them was restored.
+        """
+        self._coordinators = list(coordinators)
+        restored = False
+        for coordinator in self._coordinators:
+            coordinator.store = self
+            if (state := self._hosts.get(coordinator.unique_prefix)) is not None:
+                coordinator.restore_state(state)
+                restored = True
+        return restored
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Save all hosts after a short delay, batching bursts of updates."""
+        self._store.async_delay_save(self._data_to_save, STORAGE_SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the state of every host."""
+        return {
+            "hosts": {
+                coordinator.unique_prefix: coordinator.stored_state()
+                for coordinator in self._coordinators
+            }
+        }
+
+    async def async_remove(self) -> None:
+        """Delete the saved state, when the config entry is removed."""
+        await self._store.async_remove()
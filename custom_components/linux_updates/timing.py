@@ -0,0 +1,146 @@
+"""Version: 1.1.0 | Datum: 2026-10-18
+Per-phase timing of SSH operations for Linux Updates.
+"""
+from __future__ import annotations
+
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from typing import Any, Iterator
+
+PHASE_DNS = "dns"
+PHASE_TCP = "tcp"
+PHASE_HANDSHAKE = "handshake"  # Key exchange and authentication
+PHASE_REMOTE = "remote"  # Commands running on the host
+PHASE_PARSE = "parse"
+PHASE_TOTAL = "total"
+PHASES = (PHASE_DNS, PHASE_TCP, PHASE_HANDSHAKE, PHASE_REMOTE, PHASE_PARSE, PHASE_TOTAL)
+
+OPERATION_CHECK = "check"
+OPERATION_UPGRADE = "upgrade"
+OPERATION_PREFETCH = "prefetch"
+OPERATION_REBOOT = "reboot"
+
+# Upper bucket bounds in milliseconds, the last bucket takes everything above
+HISTOGRAM_BUCKETS_MS = (10, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+class OperationTimer:
+    """Collect the phase durations of one run of an operation.
+
+    A phase may be entered several times (two remote commands in one check),
+    its durations are summed.
+    """
+
+    def __init__(self, operation: str) -> None:
+        """Initialize."""
+        self.operation = operation
+        self.phases: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Time the enclosed block as (part of) a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[phase] = self.phases.get(phase, 0.0) + time.perf_counter() - start
+
+    def elapsed(self) -> float:
+        """Return the seconds since the operation started."""
+        return time.perf_counter() - self._started
+
+
+def measure(timer: OperationTimer | None, phase: str):
+    """Return a context manager timing a phase, or doing nothing without a timer."""
+    return timer.measure(phase) if timer is not None else nullcontext()
+
+
+class PhaseHistogram:
+    """Rolling window of durations (seconds) for one operation phase."""
+
+    def __init__(self, samples: int) -> None:
+        """Initialize."""
+        self.samples: deque[float] = deque(maxlen=samples)
+        self.total_count = 0
+
+    def add(self, seconds: float) -> None:
+        """Add one sample."""
+        self.samples.append(seconds)
+        self.total_count += 1
+
+    @property
+    def last(self) -> float | None:
+        """Return the most recent sample."""
+        return self.samples[-1] if self.samples else None
+
+    def percentile(self, pct: float) -> float | None:
+        """Return the nearest-rank percentile of the window."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+    def buckets(self) -> dict[str, int]:
+        """Return the window as counts per duration bucket."""
+        counts = dict.fromkeys([f"le_{bound}" for bound in HISTOGRAM_BUCKETS_MS] + ["inf"], 0)
+        for seconds in self.samples:
+            ms = seconds * 1000
+            for bound in HISTOGRAM_BUCKETS_MS:
+                if ms <= bound:
+                    counts[f"le_{bound}"] += 1
+                    break
+            else:
+                counts["inf"] += 1
+        return counts
+
+    def summary(self) -> dict[str, Any]:
+        """Return the window statistics in milliseconds."""
+
+        def _ms(value: float | None) -> float | None:
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "samples": len(self.samples),
+            "total_count": self.total_count,
+            "last_ms": _ms(self.last),
+            "p50_ms": _ms(self.percentile(50)),
+            "p90_ms": _ms(self.percentile(90)),
+            "max_ms": _ms(max(self.samples, default=None)),
+        }
+
+
+class HostTimings:
+    """Rolling per-phase histograms of every operation against one host."""
+
+    def __init__(self, samples: int) -> None:
+        """Initialize."""
+        self._samples = samples
+        self.histograms: dict[tuple[str, str], PhaseHistogram] = {}
+        self.last_run: dict[str, dict[str, float]] = {}
+
+    def record(self, timer: OperationTimer) -> None:
+        """Store the phases of a finished operation, plus its total duration."""
+        phases = {**timer.phases, PHASE_TOTAL: timer.elapsed()}
+        for phase, seconds in phases.items():
+            key = (timer.operation, phase)
+            if (histogram := self.histograms.get(key)) is None:
+                histogram = self.histograms[key] = PhaseHistogram(self._samples)
+            histogram.add(seconds)
+        self.last_run[timer.operation] = phases
+
+    def get(self, operation: str, phase: str) -> PhaseHistogram | None:
+        """Return the histogram of one operation phase, if it has samples."""
+        return self.histograms.get((operation, phase))
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all histograms for diagnostics."""
+        result: dict[str, Any] = {}
+        for (operation, phase), histogram in sorted(self.histograms.items()):
+            result.setdefault(operation, {})[phase] = {
+                **histogram.summary(),
+                "histogram": histogram.buckets(),
+            }
+        return result
@@ -0,0 +1,145 @@
+"""Version: 1.0.0 | Datum: 2026-10-18
+Push mode for Linux Updates: a long-lived SSH channel reporting changes.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CMD_WATCH,
+    DOMAIN,
+    PUSH_DEBOUNCE,
+    PUSH_RETRY_INITIAL,
+    PUSH_RETRY_MAX,
+)
+
+if TYPE_CHECKING:
+    from .connection import SSHConnectionManager
+
+_LOGGER = logging.getLogger(__name__)
+
+_MODE_PREFIX = "watch: "
+
+
+class ChangeWatcher:
+    """Run CMD_WATCH on one host and call back when its package state changed.
+
+    Events are debounced: the callback runs once the host has been quiet for
+    PUSH_DEBOUNCE seconds, so a long dpkg run causes one check at its end.
+    When the channel drops it is reopened with exponential backoff, and
+    ``on_state`` is called so the owner can poll in the meantime.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        connections: SSHConnectionManager,
+        config: dict[str, Any],
+        on_change: Callable[[], Awaitable[Any]],
+        on_state: Callable[[], None],
+    ) -> None:
+        """Initialize."""
+        self.hass = hass
+        self._connections = connections
+        self._config = config
+        self._on_change = on_change
+        self._on_state = on_state
+        self._task: asyncio.Task | None = None
+        self._unsub_debounce = None
+        self.connected = False
+        self.connected_since = None
+        self.mode: str | None = None  # "inotify" or "stat", as reported by the host
+        self.events = 0
+        self.reconnects = 0
+        self.last_error: str | None = None
+
+    def start(self) -> None:
+        """Open the channel in the background."""
+        host = self._config.get("host")
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), f"{DOMAIN} watcher {host}"
+        )
+
+    async def async_stop(self) -> None:
+        """Close the channel, when the entry is unloaded."""
+        self._cancel_debounce()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _async_run(self) -> None:
+        """Keep the watcher running, reopening it after failures."""
+        delay = PUSH_RETRY_INITIAL
+        while True:
+            try:
+                async with self._connections.async_process(self._config, CMD_WATCH) as process:
+                    async for line in process.stdout:
+                        line = line.strip()
+                        if line.startswith(_MODE_PREFIX):
+                            self.mode = line[len(_MODE_PREFIX):]
+                            self._set_connected(True)
+                            delay = PUSH_RETRY_INITIAL
+                        elif line:
+                            self.events += 1
+                            self._debounce()
+                self.last_error = "Watcher exited"
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:  # pylint: disable=broad-except
+                # Any failure falls back to polling, never kill the task
+                self.last_error = str(err) or type(err).__name__
+            finally:
+                self._set_connected(False)
+
+            _LOGGER.debug(
+                "Watcher on %s down (%s), retrying in %s s",
+                self._config.get("host"), self.last_error, delay,
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, PUSH_RETRY_MAX)
+            self.reconnects += 1
+
+    def _set_connected(self, connected: bool) -> None:
+        if connected == self.connected:
+            return
+        self.connected = connected
+        self.connected_since = dt_util.now() if connected else None
+        self._on_state()
+
+    def _debounce(self) -> None:
+        """(Re)start the quiet period before the callback."""
+        self._cancel_debounce()
+        self._unsub_debounce = async_call_later(self.hass, PUSH_DEBOUNCE, self._async_fire)
+
+    def _cancel_debounce(self) -> None:
+        if self._unsub_debounce is not None:
+            self._unsub_debounce()
+            self._unsub_debounce = None
+
+    @callback
+    def _async_fire(self, _now=None) -> None:
+        self._unsub_debounce = None
+        self.hass.async_create_background_task(
+            self._on_change(), f"{DOMAIN} push refresh {self._config.get('host')}"
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the watcher state for diagnostics."""
+        return {
+            "connected": self.connected,
+            "connected_since": self.connected_since.isoformat() if self.connected_since else None,
+            "mode": self.mode,
+            "events": self.events,
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }